@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+# user id: (expiry of cache entry, user), in order of expiry as the TTL is the same for all
+_users = OrderedDict()
+_users_lock = threading.Lock()
+
+
+def forget_user(user_id):
+    """Drops the user cached by this process"""
+    _users.pop(user_id, None)
+
+
+def clear_user_cache():
+    _users.clear()
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """JWT authentication avoiding a user query on every request
+
+    Users loaded from database are kept in process for JWT_USER_CACHE_TTL
+    seconds. Changes made by this process drop the entry at once, changes made
+    by other processes are seen once it expires. Nothing is trusted from the
+    token besides the user id, so a deleted or deactivated user, or a demoted
+    one, never keeps access for longer than the TTL.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            return super().get_user(validated_token)
+
+        cached = _users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        # Raises for missing and inactive users
+        user = super().get_user(validated_token)
+        now = time.monotonic()
+        with _users_lock:
+            _users.pop(user_id, None)
+            # Expired users are dropped, so the cache does not grow with every token holder
+            while _users and next(iter(_users.values()))[0] <= now:
+                _users.popitem(last=False)
+            _users[user_id] = (now + settings.JWT_USER_CACHE_TTL, user)
+        return user
@@ -0,0 +1,211 @@
+"""Seeding and in-process load generation for the benchmark command"""
+import io
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import OperationalError, connection, connections, transaction
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title, User, normalize_search
+from .caching import bump_model_versions
+from .search import is_search_supported
+
+WORDS = ('кино', 'книга', 'сюжет', 'герой', 'финал', 'музыка', 'актёр', 'драма', 'смех', 'космос',
+         'история', 'любовь', 'погоня', 'тайна', 'город', 'море', 'война', 'детство', 'песня', 'мечта')
+
+
+def sentence(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def bulk_insert(model, objects, batch_size=2000):
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+def seed(users=50, categories=5, genres=15, titles=500, reviews_per_title=10,
+         comments_per_review=2, random_seed=0):
+    """Fills database with generated catalogue, ids start from 1"""
+    rng = random.Random(random_seed)
+    reviews_per_title = min(reviews_per_title, users)
+    with transaction.atomic():
+        bulk_insert(User, (
+            User(id=i, username=f'user{i}', email=f'user{i}@yamdb.fake', password='!')
+            for i in range(1, users + 1)
+        ))
+        bulk_insert(Category, (
+            Category(id=i, name=f'Категория {i}', slug=f'category-{i}') for i in range(1, categories + 1)
+        ))
+        bulk_insert(Genre, (Genre(id=i, name=f'Жанр {i}', slug=f'genre-{i}') for i in range(1, genres + 1)))
+        names = (sentence(rng, 3) for _ in range(titles))
+        bulk_insert(Title, (
+            Title(id=i, name=name, search_name=normalize_search(name), year=rng.randint(1900, 2020),
+                  category_id=rng.randint(1, categories))
+            for i, name in enumerate(names, 1)
+        ))
+        bulk_insert(GenreTitle, (
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for title_id in range(1, titles + 1)
+            for genre_id in rng.sample(range(1, genres + 1), min(2, genres))
+        ))
+        bulk_insert(Review, (
+            Review(id=(title_id - 1) * reviews_per_title + n + 1, title_id=title_id, author_id=author_id,
+                   text=sentence(rng, 20), score=rng.randint(1, 10))
+            for title_id in range(1, titles + 1)
+            for n, author_id in enumerate(rng.sample(range(1, users + 1), reviews_per_title))
+        ))
+        bulk_insert(Comment, (
+            Comment(review_id=review_id, author_id=rng.randint(1, users), text=sentence(rng, 10))
+            for review_id in range(1, titles * reviews_per_title + 1)
+            for _ in range(comments_per_review)
+        ))
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Category, Genre, Title, Review]):
+                cursor.execute(sql)
+        call_command('rebuild_ratings', stdout=io.StringIO())
+    bump_model_versions(User, Category, Genre, Title, GenreTitle, Review, Comment)
+
+
+def default_endpoints(titles, reviews_per_title, categories=5, genres=15):
+    """Endpoint name and a function returning url of the next request to it"""
+    def title_id(rng):
+        return rng.randint(1, titles)
+
+    def review_path(rng):
+        title = title_id(rng)
+        review = (title - 1) * reviews_per_title + rng.randint(1, reviews_per_title)
+        return f'/api/v1/titles/{title}/reviews/{review}/'
+
+    endpoints = {
+        'categories list': lambda rng: '/api/v1/categories/',
+        'genres list': lambda rng: '/api/v1/genres/',
+        'titles list': lambda rng: f'/api/v1/titles/?page={rng.randint(1, max(titles // 10, 1))}',
+        'titles by genre': lambda rng: f'/api/v1/titles/?genre=genre-{rng.randint(1, genres)}',
+        'titles by year': lambda rng: f'/api/v1/titles/?year={rng.randint(1900, 2020)}',
+        'titles by category': lambda rng: (
+            f'/api/v1/titles/?category=category-{rng.randint(1, categories)}&year={rng.randint(1900, 2020)}'
+        ),
+        'titles by name': lambda rng: f'/api/v1/titles/?name={rng.choice(WORDS)}',
+        'title detail': lambda rng: f'/api/v1/titles/{title_id(rng)}/',
+        'reviews list': lambda rng: f'/api/v1/titles/{title_id(rng)}/reviews/',
+        'reviews cursor': lambda rng: f'/api/v1/titles/{title_id(rng)}/reviews/?pagination=cursor',
+        'review detail': review_path,
+        'comments list': lambda rng: f'{review_path(rng)}comments/',
+    }
+    if is_search_supported():
+        endpoints['search'] = lambda rng: f'/api/v1/search/?q={rng.choice(WORDS)}'
+    return endpoints
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def run_endpoint(url_for, requests, concurrency, random_seed=0):
+    """Sends requests through WSGI handler from concurrent threads"""
+    def worker(worker_number):
+        rng = random.Random(random_seed * 1000 + worker_number)
+        client = Client()
+        samples = []
+        try:
+            for _ in range(worker_number, requests, concurrency):
+                url = url_for(rng)
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - started
+                if response.status_code >= 400:
+                    raise AssertionError(f'{url} answered {response.status_code}')
+                samples.append((elapsed, response.query_stats.count, response.query_stats.duration))
+        finally:
+            connections.close_all()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = [sample for result in executor.map(worker, range(concurrency)) for sample in result]
+    wall = time.perf_counter() - started
+    latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+    return {
+        'requests': len(samples),
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'rps': len(samples) / wall,
+        'queries': statistics.mean(queries for _, queries, _ in samples),
+        'db_ms': statistics.mean(duration for _, _, duration in samples),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Endpoints whose p95 latency or query count grew over tolerance from baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {before["p95"]:.1f} -> {result["p95"]:.1f} ms')
+        if 'queries' in result and result['queries'] > before['queries']:
+            regressions.append(f'{name}: queries {before["queries"]:.1f} -> {result["queries"]:.1f}')
+    return regressions
+
+
+def post_reviews(user_id, title_ids):
+    """Worker process: one user posts a review on each title"""
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(User.objects.get(pk=user_id))}')
+    rng = random.Random(user_id)
+    latencies, failures = [], 0
+    for title_id in title_ids:
+        started = time.perf_counter()
+        try:
+            response = client.post(
+                f'/api/v1/titles/{title_id}/reviews/', {'text': sentence(rng, 20), 'score': rng.randint(1, 10)}
+            )
+        except OperationalError:
+            failures += 1
+            continue
+        if response.status_code == 201:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            failures += 1
+    connections.close_all()
+    return latencies, failures
+
+
+def run_writers(processes, writes, titles):
+    """Posts reviews from separate processes sharing one database file
+
+    Every process gets a new user, so reviews never clash on (title, author).
+    """
+    first_id = User.objects.order_by('-id').values_list('id', flat=True).first() + 1
+    User.objects.bulk_create(
+        User(id=i, username=f'writer{i}', email=f'writer{i}@yamdb.fake', password='!')
+        for i in range(first_id, first_id + processes)
+    )
+    title_ids = list(range(1, min(writes, titles) + 1))
+    # Children must open their own connections, not share the parent's through fork
+    connections.close_all()
+    started = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        results = pool.starmap(post_reviews, [(i, title_ids) for i in range(first_id, first_id + processes)])
+    wall = time.perf_counter() - started
+    latencies = [latency for result, _ in results for latency in result]
+    return {
+        'requests': len(latencies),
+        'failed': sum(failures for _, failures in results),
+        'p50': percentile(latencies, 0.50) if latencies else 0,
+        'p95': percentile(latencies, 0.95) if latencies else 0,
+        'p99': percentile(latencies, 0.99) if latencies else 0,
+        'rps': len(latencies) / wall,
+    }
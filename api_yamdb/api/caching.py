@@ -0,0 +1,170 @@
+import random
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+MODEL_VERSION_KEY = 'model-version:{}'
+
+
+def initial_version():
+    """Versions lost with evicted keys start anew at random, not at a number already used"""
+    return random.getrandbits(48)
+
+
+def get_model_versions(models):
+    """Returns current cache versions of given models"""
+    keys = [MODEL_VERSION_KEY.format(model._meta.label_lower) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, initial_version(), None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump_model_versions(*models):
+    """Makes everything cached over given models stale
+
+    Done once the current transaction commits, at once outside of one. A reader
+    getting the new version before the commit would cache old rows under it.
+    """
+    def bump():
+        for model in models:
+            key = MODEL_VERSION_KEY.format(model._meta.label_lower)
+            cache.add(key, initial_version(), None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Key was evicted between add and incr
+                cache.set(key, initial_version(), None)
+
+    transaction.on_commit(bump)
+
+
+class ModelDictionary:
+    """Whole table of a small model kept in process, genres and categories by id and slug
+
+    Model version in the cache is checked on every get_dictionary() and the
+    table is loaded again with one query after it changes or DICTIONARY_TTL
+    seconds pass. Writes of this process are seen at once, so are writes of
+    other processes when the cache backend is shared between them. With the
+    default per-process locmem cache they are seen within DICTIONARY_TTL.
+    A dictionary is not changed after loading, its objects and representations
+    are shared between requests and must not be modified.
+    """
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        self.loaded_at = time.monotonic()
+        objects = list(model.objects.all())
+        self.by_id = {obj.pk: obj for obj in objects}
+        self.by_slug = {obj.slug: obj for obj in objects}
+        self.rendered = {}
+
+    def render(self, pk, serializer_class):
+        """Representation of the object, made once per loaded table"""
+        key = (serializer_class, pk)
+        if key not in self.rendered:
+            self.rendered[key] = serializer_class(self.by_id[pk]).data
+        return self.rendered[key]
+
+
+_dictionaries = {}
+
+
+def get_dictionary(model, reload=False):
+    """Up to date ModelDictionary of the model, reload reads the table anyway"""
+    version, = get_model_versions([model])
+    dictionary = _dictionaries.get(model)
+    if (reload or dictionary is None or dictionary.version != version
+            or time.monotonic() - dictionary.loaded_at >= settings.DICTIONARY_TTL):
+        # Version is read before the table, a write in between only causes one more reload
+        dictionary = _dictionaries[model] = ModelDictionary(model, version)
+    return dictionary
+
+
+def clear_dictionaries():
+    _dictionaries.clear()
+
+
+def versioned_key(prefix, models, *parts):
+    """Cache key that changes as soon as any of the models is written"""
+    versions = '.'.join(str(version) for version in get_model_versions(models))
+    digest = md5(repr(parts).encode()).hexdigest()
+    return f'{prefix}:{versions}:{digest}'
+
+
+class CachedResponseMixin:
+    """Caches list and retrieve responses until a model of response_cache_models is written
+
+    Responses are keyed on path, query string and permission classes of the view,
+    and on the version token of ConditionalGetMixin placed before it, so a
+    cached body always matches the ETag sent with it.
+    """
+    response_cache_models = ()
+
+    def get_response_cache_key(self, request):
+        models = [self.get_queryset().model, *self.response_cache_models]
+        permissions = [permission.__class__.__name__ for permission in self.get_permissions()]
+        return versioned_key(
+            'response', models, request.path, sorted(request.query_params.lists()), permissions,
+            getattr(self, 'conditional_token', None)
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """Answers list and retrieve with ETag and Last-Modified, 304 when unchanged
+
+    Views implement get_conditional_state(), returning a version token and
+    modification datetime of what would be rendered, or None to skip.
+    """
+    def get_conditional_state(self):
+        raise NotImplementedError
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        state = self.get_conditional_state()
+        if state is None:
+            return handler(request, *args, **kwargs)
+        token, modified = state
+        self.conditional_token = token
+        etag = quote_etag(md5(repr((
+            token, request.path, sorted(request.query_params.lists()), request.accepted_media_type
+        )).encode()).hexdigest())
+        last_modified = int(modified.timestamp()) if modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,52 @@
+import csv
+import json
+from datetime import datetime, timezone
+
+from reviews.models import Comment, Review, Title
+
+# Export name: model, columns of static/data csv file, model fields for them
+EXPORTS = {
+    'titles': (Title, ('id', 'name', 'year', 'category'), ('id', 'name', 'year', 'category_id')),
+    'reviews': (
+        Review,
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+    ),
+    'comments': (
+        Comment,
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+    ),
+}
+EXPORT_FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+class Echo:
+    """File-like object handing written csv line back to the caller"""
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    """Dates are written the same way as in static/data files"""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc)
+        return value.strftime('%Y-%m-%dT%H:%M:%S.') + f'{value.microsecond // 1000:03d}Z'
+    return value
+
+
+def export_lines(name, output='csv', chunk_size=2000):
+    """Yields export lines, reading rows from database chunk by chunk"""
+    model, columns, fields = EXPORTS[name]
+    rows = model.objects.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+    if output == 'csv':
+        writer = csv.writer(Echo(), lineterminator='\n')
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([format_value(value) for value in row])
+    else:
+        for row in rows:
+            yield json.dumps(
+                dict(zip(columns, (format_value(value) for value in row))), ensure_ascii=False
+            ) + '\n'
@@ -1,15 +1,50 @@
+from django.db import connection
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title, normalize_search
+from .caching import get_dictionary
 
 
 class TitleFilter(filters.FilterSet):
-    """Filter for Title by specified fields"""
-    category = filters.CharFilter(field_name='category__slug', lookup_expr='icontains')
-    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='icontains')
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    """Filter for Title by specified fields
+
+    Category and genre slugs are turned into ids by in-process dictionaries,
+    so no join is needed, name is matched by prefix of the indexed normalized name.
+    Slugs changed by other processes are matched within DICTIONARY_TTL.
+    """
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    name = filters.CharFilter(method='filter_name')
     year = filters.NumberFilter(field_name='year', lookup_expr='exact')
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
\ No newline at end of file
+        fields = ['category', 'genre', 'name', 'year']
+
+    def filter_category(self, queryset, name, value):
+        category = get_dictionary(Category).by_slug.get(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.pk)
+
+    def filter_genre(self, queryset, name, value):
+        """Subquery instead of join, so titles are not duplicated"""
+        genre = get_dictionary(Genre).by_slug.get(value)
+        if genre is None:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=GenreTitle.objects.filter(genre_id=genre.pk).values('title_id')
+        )
+
+    def filter_name(self, queryset, name, value):
+        """Prefix of the normalized name, read from an index
+
+        SQLite compares text by code points, so a range up to the largest one
+        covers the prefix, while its LIKE is case insensitive and skips the
+        index. PostgreSQL keeps a pattern index for indexed char fields, and a
+        range would depend on the database collation there.
+        """
+        prefix = normalize_search(value)
+        if connection.vendor == 'postgresql':
+            return queryset.filter(search_name__startswith=prefix)
+        return queryset.filter(search_name__gte=prefix, search_name__lt=prefix + '\U0010ffff')
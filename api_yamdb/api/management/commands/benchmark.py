@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.benchmark import compare, default_endpoints, run_endpoint, run_writers, seed
+
+
+class Command(BaseCommand):
+    """Seed a throwaway database and load the read API with concurrent clients"""
+    help = 'Benchmark latency, throughput and query counts of /api/v1/ endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=15)
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument('--reviews-per-title', type=int, default=10)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--endpoint', action='append', help='Run only given endpoints')
+        parser.add_argument(
+            '--writers', type=int, default=0,
+            help='Processes posting reviews concurrently after read endpoints, all of them unless --endpoint is given'
+        )
+        parser.add_argument('--writes', type=int, default=50, help='Reviews posted by each writer')
+        parser.add_argument(
+            '--no-cache', action='store_true', help='Do not cache responses and counts, measure database work'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of data and urls')
+        parser.add_argument('--save', help='Write results as json baseline to file')
+        parser.add_argument('--baseline', help='Compare results with json baseline from file')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed p95 latency growth over baseline, 0.2 is 20%%'
+        )
+
+    def handle(self, *args, **options):
+        endpoints = default_endpoints(
+            options['titles'], min(options['reviews_per_title'], options['users']),
+            options['categories'], options['genres'],
+        )
+        names = options['endpoint'] or list(endpoints)
+        unknown = set(names) - set(endpoints)
+        if unknown:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}')
+
+        # Same throwaway database the test runner uses, the configured one stays untouched
+        old_name = connection.settings_dict['NAME']
+        if options['writers'] and connection.vendor == 'sqlite':
+            # Writer processes cannot share an in-memory database
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        no_cache = {'RESPONSE_CACHE_TIMEOUT': 0, 'PAGINATION_COUNT_CACHE_TIMEOUT': 0} if options['no_cache'] else {}
+        with override_settings(**no_cache):
+            try:
+                seed(
+                    users=options['users'], categories=options['categories'], genres=options['genres'],
+                    titles=options['titles'], reviews_per_title=options['reviews_per_title'],
+                    comments_per_review=options['comments_per_review'], random_seed=options['seed'],
+                )
+                results = self.benchmark_endpoints({name: endpoints[name] for name in names}, options)
+                if options['writers']:
+                    results['post reviews'] = self.benchmark_writers(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                regressions = compare(results, json.load(file), options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def benchmark_endpoints(self, endpoints, options):
+        results = {}
+        self.stdout.write(
+            f'{"endpoint":<20}{"requests":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            f'{"rps":>9}{"queries":>9}{"db ms":>9}'
+        )
+        for name, next_url in endpoints.items():
+            result = run_endpoint(next_url, options['requests'], options['concurrency'], options['seed'])
+            results[name] = result
+            self.stdout.write(
+                f'{name:<20}{result["requests"]:>9}{result["p50"]:>9.1f}{result["p95"]:>9.1f}'
+                f'{result["p99"]:>9.1f}{result["rps"]:>9.1f}{result["queries"]:>9.1f}'
+                f'{result["db_ms"]:>9.1f}'
+            )
+        return results
+
+    def benchmark_writers(self, options):
+        result = run_writers(options['writers'], options['writes'], options['titles'])
+        self.stdout.write(
+            f'{"post reviews":<20}{result["requests"]:>9}{result["p50"]:>9.1f}{result["p95"]:>9.1f}'
+            f'{result["p99"]:>9.1f}{result["rps"]:>9.1f}{"-":>9}{"-":>9}'
+        )
+        if result['failed']:
+            self.stderr.write(f'{result["failed"]} reviews failed, e.g. database is locked')
+        return result
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_FORMATS, EXPORTS, export_lines
+
+
+class Command(BaseCommand):
+    """Dump titles, reviews or comments in the layout of static/data files"""
+    help = 'Export titles, reviews or comments as csv or ndjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS))
+        parser.add_argument('--output', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--file', help='Write to file instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['name'], options['output'], options['chunk_size'])
+        if options['file'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['file'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(lines)
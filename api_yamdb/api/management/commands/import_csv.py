@@ -0,0 +1,116 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.caching import bump_model_versions
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title, User, normalize_search
+
+
+def build_user(row):
+    return User(
+        id=row['id'], username=row['username'], email=row['email'], role=row['role'],
+        bio=row['bio'] or None, first_name=row['first_name'] or None,
+        last_name=row['last_name'] or None, password=make_password(None),
+    )
+
+
+def build_title(row):
+    return Title(
+        id=row['id'], name=row['name'], search_name=normalize_search(row['name']),
+        year=row['year'], category_id=row['category'] or None,
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row['id'], title_id=row['title_id'], text=row['text'], author_id=row['author'],
+        score=row['score'], pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row['id'], review_id=row['review_id'], text=row['text'], author_id=row['author'],
+        pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+# Files in dependency order: every row refers only to rows of files above it
+IMPORT_FILES = (
+    ('users.csv', User, build_user),
+    ('category.csv', Category, lambda row: Category(**row)),
+    ('genre.csv', Genre, lambda row: Genre(**row)),
+    ('titles.csv', Title, build_title),
+    ('genre_title.csv', GenreTitle, lambda row: GenreTitle(**row)),
+    ('review.csv', Review, build_review),
+    ('comments.csv', Comment, build_comment),
+)
+
+
+@contextmanager
+def keep_pub_date():
+    """Stop auto_now_add from overwriting publication dates taken from files"""
+    fields = [Review._meta.get_field('pub_date'), Comment._meta.get_field('pub_date')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """Load static/data csv files with bulk inserts in one transaction"""
+    help = 'Import users, categories, genres, titles, reviews and comments from csv files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Directory with csv files'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        missing = [
+            name for name, _, _ in IMPORT_FILES
+            if not os.path.isfile(os.path.join(options['path'], name))
+        ]
+        if missing:
+            raise CommandError(f'Files not found in {options["path"]}: {", ".join(missing)}')
+
+        with transaction.atomic(), keep_pub_date():
+            for name, model, build in IMPORT_FILES:
+                self.import_file(os.path.join(options['path'], name), model, build, options['batch_size'])
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [model for _, model, _ in IMPORT_FILES]):
+                    cursor.execute(sql)
+            call_command('rebuild_ratings', stdout=self.stdout)
+        bump_model_versions(*(model for _, model, _ in IMPORT_FILES))
+
+    def import_file(self, path, model, build, batch_size):
+        started = time.monotonic()
+        total = 0
+        with open(path, encoding='utf-8', newline='') as file:
+            objects = (build(row) for row in csv.DictReader(file))
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{os.path.basename(path)}: {total} rows in {elapsed:.2f}s '
+            f'({total / elapsed if elapsed else 0:.0f} rows/sec)'
+        )
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .caching import versioned_key
+
+
+class CachedCountPaginator(Paginator):
+    """Django paginator taking its count from the given loader"""
+    def __init__(self, object_list, per_page, count_loader, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_loader = count_loader
+
+    @cached_property
+    def count(self):
+        return self.count_loader(self.object_list)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Page number pagination serving count from cache or from an estimate
+
+    Cached count is keyed on request path and filters and goes stale as soon
+    as any model of the queryset or of `view.count_cache_models` is written.
+    Unfiltered querysets above PAGINATION_ESTIMATED_COUNT_THRESHOLD rows are
+    counted approximately. Response tells whether the count is exact.
+    """
+    count_is_exact = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.django_paginator_class = partial(CachedCountPaginator, count_loader=self.get_count)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, queryset):
+        models = [queryset.model, *getattr(self.view, 'count_cache_models', ())]
+        query = sorted(
+            (key, value) for key, value in self.request.query_params.lists()
+            if key != self.page_query_param
+        )
+        return versioned_key('pagination-count', models, self.request.path, query)
+
+    def estimate_count(self, queryset):
+        """Cheap row count estimate of unfiltered querysets over large tables"""
+        threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+        if threshold is None or queryset.query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            estimate = queryset.aggregate(estimate=Max('pk'))['estimate']
+        if estimate is None or estimate < threshold:
+            return None
+        return int(estimate)
+
+    def get_count(self, queryset):
+        key = self.get_count_cache_key(queryset)
+        cached = cache.get(key)
+        if cached is None:
+            estimate = self.estimate_count(queryset)
+            if estimate is None:
+                cached = (queryset.count(), True)
+            else:
+                cached = (estimate, False)
+            cache.set(key, cached, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        count, self.count_is_exact = cached
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data = OrderedDict([
+            ('count', response.data['count']),
+            ('count_is_exact', self.count_is_exact),
+            *((key, value) for key, value in response.data.items() if key != 'count'),
+        ])
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_exact'] = {'type': 'boolean', 'example': True}
+        return response_schema
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Keyset pagination over publication date with id as tiebreaker"""
+    ordering = ('-pub_date', '-id')
+
+
+class PageNumberOrCursorPagination(CachedCountPagination):
+    """Page number pagination, switched to cursor pagination by query parameter
+
+    Clients opt in with `?pagination=cursor` and then follow `next`/`previous`
+    links, which keep fetching a page in constant time at any depth.
+    """
+    mode_query_param = 'pagination'
+    cursor_paginator_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        cursor_query_param = self.cursor_paginator_class.cursor_query_param
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_paginator_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
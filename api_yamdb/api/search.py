@@ -0,0 +1,82 @@
+from django.db import connection
+from django.utils.html import escape
+
+# Snippet markers, replaced by <mark> after the text is escaped
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+# Best matches of one table. Every match is still scored, but only the best
+# LIMIT are kept; ORDER BY rank instead makes FTS5 sort all of them
+RANK_SQL = """
+    SELECT rowid, bm25({fts}) AS score FROM {fts} WHERE {fts} MATCH %s ORDER BY score LIMIT %s
+"""
+
+# Texts of the page only: matched rows are joined and cut into snippets once ranked
+PAGE_SQL = {
+    'review': f"""
+        SELECT review.id, review.title_id, NULL,
+               snippet(reviews_review_fts, 0, '{MARK_START}', '{MARK_END}', '…', 16)
+        FROM reviews_review_fts
+        JOIN reviews_review review ON review.id = reviews_review_fts.rowid
+        WHERE reviews_review_fts MATCH %s AND reviews_review_fts.rowid IN ({{ids}})
+    """,
+    'comment': f"""
+        SELECT comment.id, review.title_id, comment.review_id,
+               snippet(reviews_comment_fts, 0, '{MARK_START}', '{MARK_END}', '…', 16)
+        FROM reviews_comment_fts
+        JOIN reviews_comment comment ON comment.id = reviews_comment_fts.rowid
+        JOIN reviews_review review ON review.id = comment.review_id
+        WHERE reviews_comment_fts MATCH %s AND reviews_comment_fts.rowid IN ({{ids}})
+    """,
+}
+FTS_TABLES = {'review': 'reviews_review_fts', 'comment': 'reviews_comment_fts'}
+
+
+def is_search_supported():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """Every word must be present, the last one may be unfinished
+
+    Words are quoted, so user input is never taken as FTS syntax.
+    """
+    words = ['"{}"'.format(word.replace('"', '""')) for word in query.split()]
+    return ' '.join(words) + '*'
+
+
+def highlight(snippet):
+    return escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_texts(query, limit, offset=0):
+    """Reviews and comments matching all words of query, best ranked first
+
+    Each table gives its own best limit + offset matches, the page is cut from
+    both, then only its rows are joined and get snippets.
+    """
+    match = build_match_query(query)
+    ranked = []
+    with connection.cursor() as cursor:
+        for kind, fts in FTS_TABLES.items():
+            cursor.execute(RANK_SQL.format(fts=fts), [match, limit + offset])
+            ranked.extend((rank, kind, pk) for pk, rank in cursor.fetchall())
+        page = sorted(ranked)[offset:offset + limit]
+        texts = {}
+        for kind in FTS_TABLES:
+            ids = [pk for _, page_kind, pk in page if page_kind == kind]
+            if ids:
+                cursor.execute(PAGE_SQL[kind].format(ids=', '.join(['%s'] * len(ids))), [match, *ids])
+                texts.update(((kind, row[0]), row[1:]) for row in cursor.fetchall())
+    return [
+        {
+            'type': kind,
+            'id': pk,
+            'title_id': texts[kind, pk][0],
+            'review_id': texts[kind, pk][1],
+            'snippet': highlight(texts[kind, pk][2]),
+            'rank': -rank,
+        }
+        for rank, kind, pk in page
+        if (kind, pk) in texts
+    ]
@@ -1,7 +1,14 @@
-from django.shortcuts import get_object_or_404
+import datetime
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Genre, Title, Review, Comment, User, GenreTitle
+from reviews.models import Category, Genre, Title, Review, Comment, User, GenreTitle, normalize_search
+from .caching import bump_model_versions, clear_dictionaries, get_dictionary
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -46,42 +53,216 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
+class DictionaryObjectField(serializers.Field):
+    """Read-only object rendered from the in-process dictionary by its id
+
+    Takes the id itself or, with id_attr, an object holding it, e.g. GenreTitle.
+    Dictionary is looked up once per response and kept in serializer context,
+    changes made by other processes show up within DICTIONARY_TTL.
+    """
+    def __init__(self, serializer_class, id_attr=None, **kwargs):
+        kwargs['read_only'] = True
+        self.serializer_class = serializer_class
+        self.id_attr = id_attr
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        pk = getattr(value, self.id_attr) if self.id_attr else value
+        model = self.serializer_class.Meta.model
+        key = ('dictionary', model)
+        if key not in self.context:
+            self.context[key] = get_dictionary(model)
+        dictionary = self.context[key]
+        if pk in dictionary.by_id:
+            return dictionary.render(pk, self.serializer_class)
+        # Object written after the dictionary was loaded is read directly
+        return self.serializer_class(model.objects.get(pk=pk)).data
+
+
 class TitleGetSerializer(serializers.ModelSerializer):
-    """Title Serializer for GET-request"""
-    rating = serializers.SerializerMethodField()
-    category = CategorySerializer(read_only=True)
-    genre = GenreSerializer(required=False, many=True, read_only=True)
+    """Title Serializer for GET-request
+
+    Category and genres come from in-process dictionaries, only genre links
+    of titles are read from the database.
+    """
+    category = DictionaryObjectField(CategorySerializer, source='category_id')
+    genre = serializers.ListField(
+        child=DictionaryObjectField(GenreSerializer, id_attr='genre_id'), source='genre_title.all', read_only=True
+    )
 
     class Meta:
         fields = ('id', 'name', 'year', 'description', 'category', 'genre', 'rating')
         model = Title
 
-    def get_rating(self, obj):
-        """Calculated based on all reviews for this Title"""
-        reviews = Review.objects.filter(title=obj.id)
-        n = len(reviews)
-        total_score = sum([int(review.score) for review in reviews])
-        if n == 0:
-            return None
-        return total_score/n
+
+def removed_dictionary_object():
+    """Error for a category or genre deleted by another process after validation"""
+    clear_dictionaries()
+    return serializers.ValidationError({
+        api_settings.NON_FIELD_ERRORS_KEY: ['Category or genre no longer exists']
+    })
+
+
+class DictionarySlugRelatedField(serializers.SlugRelatedField):
+    """Slug field resolving objects from the in-process dictionary of the model
+
+    A missing slug reloads the dictionary once, it may be created by another process.
+    """
+    default_error_messages = {
+        'does_not_exist_many': 'Objects with {slug_name} {values} do not exist.',
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
+
+    def get_objects(self, reload=False):
+        """Objects of the field's model by slug"""
+        return get_dictionary(self.get_queryset().model, reload).by_slug
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        objects = self.get_objects()
+        if data not in objects:
+            objects = self.get_objects(reload=True)
+        try:
+            return objects[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+
+
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """List of slugs resolved at once, all missing slugs are reported together"""
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        if not all(isinstance(slug, str) for slug in data):
+            self.child_relation.fail('invalid')
+        objects = self.child_relation.get_objects()
+        if any(slug not in objects for slug in data):
+            objects = self.child_relation.get_objects(reload=True)
+        missing = [slug for slug in dict.fromkeys(data) if slug not in objects]
+        if missing:
+            self.child_relation.fail(
+                'does_not_exist_many', slug_name=self.child_relation.slug_field, values=', '.join(missing)
+            )
+        return [objects[slug] for slug in data]
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Bulk create and update of titles with their genres
+
+    Titles and genre links are written with bulk queries in one transaction,
+    except titles created on backends not returning ids from bulk insert.
+    Update expects instances in the order of items of data.
+    """
+    @staticmethod
+    def link_genres(titles, genres):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre_id)
+            for title, title_genres in zip(titles, genres)
+            for genre_id in dict.fromkeys(genre.pk for genre in title_genres)
+        )
+
+    def create(self, validated_data):
+        genres = [attrs.pop('genre', []) for attrs in validated_data]
+        titles = [Title(search_name=normalize_search(attrs['name']), **attrs) for attrs in validated_data]
+        try:
+            with transaction.atomic():
+                if connection.features.can_return_ids_from_bulk_insert:
+                    Title.objects.bulk_create(titles)
+                else:
+                    # SQLite does not return ids from bulk insert, links need them
+                    for title in titles:
+                        title.save(force_insert=True)
+                self.link_genres(titles, genres)
+        except IntegrityError:
+            raise removed_dictionary_object()
+        bump_model_versions(Title, GenreTitle)
+        return titles
+
+    def update(self, instances, validated_data):
+        changed = {'version', 'modified'}
+        with_genres = []
+        for title, attrs in zip(instances, validated_data):
+            if 'genre' in attrs:
+                with_genres.append((title, attrs.pop('genre')))
+            for field, value in attrs.items():
+                setattr(title, field, value)
+                changed.add(field)
+            title.search_name = normalize_search(title.name)
+            title.version = F('version') + 1
+            title.modified = timezone.now()
+        if 'name' in changed:
+            changed.add('search_name')
+        try:
+            with transaction.atomic():
+                Title.objects.bulk_update(instances, changed)
+                if with_genres:
+                    titles, genres = zip(*with_genres)
+                    # Plain DELETE: per-link signals would touch the titles again and
+                    # bump versions once per link, both are done for the batch here
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            'DELETE FROM {} WHERE title_id IN ({})'.format(
+                                connection.ops.quote_name(GenreTitle._meta.db_table),
+                                ', '.join(['%s'] * len(titles))
+                            ),
+                            [title.pk for title in titles]
+                        )
+                    self.link_genres(titles, genres)
+        except IntegrityError:
+            raise removed_dictionary_object()
+        bump_model_versions(Title, GenreTitle)
+        return instances
 
 
 class TitleSerializer(serializers.ModelSerializer):
     """Title Serializer for POST-request"""
-    genre = serializers.SlugRelatedField(
+    genre = DictionarySlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True,
         required=False
     )
-    category = serializers.SlugRelatedField(
+    category = DictionarySlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('search_name', 'rating_sum', 'rating_count', 'version', 'modified')
         model = Title
+        list_serializer_class = TitleListSerializer
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise removed_dictionary_object()
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise removed_dictionary_object()
+
+    def validate_year(self, year):
+        """Same rules as Title.save, bulk writes do not call it"""
+        if year > datetime.date.today().year:
+            raise serializers.ValidationError('The year cannot be in the future!')
+        if year <= 0:
+            raise serializers.ValidationError('Invalid year')
+        return year
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -91,17 +272,15 @@ class ReviewSerializer(serializers.ModelSerializer):
         exclude = ('title', )
         model = Review
 
-    def validate(self, data):
-        """Check that user can leave only one review for a title"""
-        method = self.context.get('request').method
-        if method != "POST":
-            return data
-        else:
-            title = get_object_or_404(Title, pk=self.context.get('view').kwargs.get("title_id"))
-            review = Review.objects.filter(author=self.context.get('request').user, title=title)
-            if review:
-                raise serializers.ValidationError('You can not leave the second review on the same title')
-            return data
+    def create(self, validated_data):
+        """Attach title resolved by the view, user can leave only one review for a title"""
+        validated_data['title'] = self.context['title']
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['You can not leave the second review on the same title']
+            })
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -112,3 +291,13 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         exclude = ('review', )
         model = Comment
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Review or comment found by full-text search"""
+    type = serializers.ChoiceField(choices=['review', 'comment'])
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField()
+    review_id = serializers.IntegerField(allow_null=True)
+    snippet = serializers.CharField()
+    rank = serializers.FloatField()
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .authentication import forget_user
+from .caching import bump_model_versions
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=GenreTitle)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def invalidate_cached_data(sender, **kwargs):
+    """Written model makes cached responses and list counts over it stale"""
+    bump_model_versions(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    """Changed role or deleted user must not be served from this process cache"""
+    forget_user(instance.pk)
@@ -1,8 +1,8 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework import routers
 
 from .views import CategoryViewSet, GenreViewSet, TitleViewSet, ReviewViewSet, CommentViewSet, \
-    UserViewSet, UserTokenViewSet
+    UserViewSet, UserTokenViewSet, ExportView, SearchView
 
 router = routers.DefaultRouter()
 router.register('categories', CategoryViewSet)
@@ -16,4 +16,6 @@ urlpatterns = [
     path('', include(router.urls)),
     path('auth/signup/', UserTokenViewSet.as_view({'post': 'create'}), name='signup'),
     path('auth/token/', UserTokenViewSet.as_view({'post': 'create_token'}), name='token'),
+    path('search/', SearchView.as_view(), name='search'),
+    re_path(r'^export/(?P<name>titles|reviews|comments)/$', ExportView.as_view(), name='export'),
 ]
\ No newline at end of file
@@ -1,54 +1,56 @@
 from uuid import uuid4
 
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins, status, filters
-from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import AccessToken
 
+from .caching import CachedResponseMixin, ConditionalGetMixin, get_model_versions
+from .export import CONTENT_TYPES, EXPORT_FORMATS, export_lines
 from .filters import TitleFilter
+from .search import is_search_supported, search_texts
+from .pagination import CachedCountPagination, PageNumberOrCursorPagination
 from .permissions import IsAdminOrReadOnly, IsAuthorModeratorAdminSuperuserOrReadOnly, IsAdminOnly
 from .serializers import CategorySerializer, GenreSerializer, TitleSerializer, ReviewSerializer, CommentSerializer, \
-    UserCreateSerializer, UserSerializer, UserTokenSerializer, TitleGetSerializer
-from reviews.models import Category, Genre, Title, Review, Comment, User
+    UserCreateSerializer, UserSerializer, UserTokenSerializer, TitleGetSerializer, SearchResultSerializer
+from reviews.models import Category, Genre, GenreTitle, Title, Review, Comment, User, EmailOutbox
 
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 
 
 class UserTokenViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """Allow to create user, send confirmation code and obtain token"""
     queryset = User.objects.all()
     serializer_class = UserTokenSerializer
-    authentication_classes = [SessionAuthentication, BasicAuthentication]
+    authentication_classes = []
     permission_classes = (AllowAny,)
 
     def create(self, request):
         """User sends Post request with username and email and get confirmation code"""
         serializer = UserCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
         if serializer.validated_data.get('username') == 'me':
             return Response(status=status.HTTP_400_BAD_REQUEST)
         confirmation_code = uuid4()
-        serializer.save(confirmation_code=confirmation_code)
-        subject = 'Your Confirmation Code for receiving Token'
-        message = f'Your Confirmation Code is: {confirmation_code}'
-        from_email = settings.EMAIL_HOST_USER
-        email = request.data.get('email', '')
-        recipient_list = [email]
-        try:
-            send_mail(subject, message, from_email, recipient_list)
-            return Response(serializer.data)
-        except Exception:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-
-    def perform_create(self, serializer):
-        serializer.save()
+        with transaction.atomic():
+            serializer.save(confirmation_code=confirmation_code)
+            EmailOutbox.objects.create(
+                subject='Your Confirmation Code for receiving Token',
+                message=f'Your Confirmation Code is: {confirmation_code}',
+                from_email=settings.EMAIL_HOST_USER,
+                recipient=serializer.validated_data['email'],
+            )
+        return Response(serializer.data)
 
     def create_token(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -81,15 +83,17 @@ class UserViewSet(mixins.ListModelMixin,
             )
     def get_me(self, request):
         """Allows user to get detailed info about himself and edit it"""""
+        # request.user may be cached for JWT_USER_CACHE_TTL, so profile is read from database
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data,
+                user, data=request.data,
                 partial=True, context={'request': request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data)
 
     @action(
@@ -114,7 +118,7 @@ class UserViewSet(mixins.ListModelMixin,
         return Response(serializer.data)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """ViewSet for Model Category objects"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -124,24 +128,44 @@ class CategoryViewSet(viewsets.ModelViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     """ViewSet for Model Genre objects"""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnly, )
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """ViewSet for Model Title objects"""
     queryset = Title.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnly, )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    count_cache_models = (GenreTitle, Genre, Category)
+    response_cache_models = (GenreTitle, Genre, Category, Review)
+
+    def get_queryset(self):
+        """Loads genre links along with titles for GET-requests, genres themselves are cached"""
+        if self.request.method == 'GET':
+            return Title.objects.prefetch_related(
+                Prefetch('genre_title', queryset=GenreTitle.objects.only('title_id', 'genre_id').order_by('pk'))
+            )
+        return Title.objects.all()
+
+    def get_conditional_state(self):
+        """Title version for detail, cached versions of listed models for list
+
+        List state is read from the cache, not from the titles, and has no
+        Last-Modified: no single change time covers deleted titles.
+        """
+        if self.action == 'retrieve':
+            return Title.objects.filter(pk=self.kwargs.get('pk')).values_list('version', 'modified').first()
+        return tuple(get_model_versions([Title, *self.response_cache_models])), None
 
     def get_serializer_class(self):
         """Determines which serializer will be used for different request types"""
@@ -149,40 +173,138 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleGetSerializer
         return TitleSerializer
 
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        """Creates titles from a list, or updates titles given by `id` of each item"""
+        if not isinstance(request.data, list):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Expected a list of titles']})
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data, many=True)
+        else:
+            ids = [item.get('id') if isinstance(item, dict) else None for item in request.data]
+            if not all(isinstance(pk, int) for pk in ids) or len(set(ids)) != len(ids):
+                raise ValidationError({'id': ['Every title must have its own integer id']})
+            titles = Title.objects.in_bulk(ids)
+            missing = [pk for pk in ids if pk not in titles]
+            if missing:
+                raise ValidationError({'id': [f'Titles not found: {", ".join(map(str, missing))}']})
+            serializer = self.get_serializer(
+                [titles[pk] for pk in ids], data=request.data, many=True, partial=True
+            )
+        serializer.is_valid(raise_exception=True)
+        ids = [title.pk for title in serializer.save()]
+        titles = Title.objects.select_related('category').prefetch_related('genre').in_bulk(ids)
+        return Response(
+            self.get_serializer([titles[pk] for pk in ids], many=True).data,
+            status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK
+        )
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Model Review objects"""
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorModeratorAdminSuperuserOrReadOnly)
 
+    def get_title(self):
+        """Returns title from url, resolved once per request"""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        return self._title
+
+    def get_serializer_context(self):
+        """Shares resolved title with serializer"""
+        context = super().get_serializer_context()
+        context['title'] = self.get_title()
+        return context
+
     def get_queryset(self):
         """Returns queryset with reviews for specified title"""
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
+
+    def get_conditional_state(self):
+        """Title version changes with every review and comment of the title"""
+        title = self.get_title()
+        return title.version, title.modified
 
     def perform_create(self, serializer):
         """Creates review on specified title, where author is current user"""
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(title=title, author=self.request.user)
+        serializer.save(author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Model Comment objects"""
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorModeratorAdminSuperuserOrReadOnly)
 
+    def get_review(self):
+        """Returns review from url belonging to title from url, resolved once per request"""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'), title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def get_queryset(self):
         """Returns queryset with comments for specified review"""
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
+
+    def get_conditional_state(self):
+        """Title version changes with every comment on its reviews"""
+        title = self.get_review().title
+        return title.version, title.modified
 
     def perform_create(self, serializer):
         """Creates review on specified review, where author is current user"""
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        serializer.save(review=review, author=self.request.user)
\ No newline at end of file
+        serializer.save(review=self.get_review(), author=self.request.user)
+
+
+class ExportView(APIView):
+    """Streams titles, reviews or comments as csv or ndjson, only for admin"""
+    permission_classes = (IsAuthenticated, IsAdminOnly)
+
+    def get(self, request, name):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': [f'Choose one of: {", ".join(EXPORT_FORMATS)}']})
+        response = StreamingHttpResponse(export_lines(name, output), content_type=CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="{name}.{output}"'
+        return response
+
+
+class SearchView(APIView):
+    """Full-text search over review and comment text, best matches first"""
+    permission_classes = (AllowAny,)
+    page_size = api_settings.PAGE_SIZE
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': ['This field is required.']})
+        if not is_search_supported():
+            return Response({'detail': 'Search is not available for this database'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+        try:
+            page = int(request.query_params.get('page', 1))
+        except ValueError:
+            page = 0
+        if page < 1:
+            raise ValidationError({'page': ['Invalid page.']})
+
+        # One extra row tells whether there is a next page without counting matches
+        results = search_texts(query, self.page_size + 1, (page - 1) * self.page_size)
+        url = request.build_absolute_uri()
+        next_link = replace_query_param(url, 'page', page + 1) if len(results) > self.page_size else None
+        previous_link = None
+        if page == 2:
+            previous_link = remove_query_param(url, 'page')
+        elif page > 2:
+            previous_link = replace_query_param(url, 'page', page - 1)
+        serializer = SearchResultSerializer(results[:self.page_size], many=True)
+        return Response({'next': next_link, 'previous': previous_link, 'results': serializer.data})
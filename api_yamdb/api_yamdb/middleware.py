@@ -0,0 +1,150 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.db import connections
+from django.middleware import csrf
+
+logger = logging.getLogger(__name__)
+
+
+class ApiBypassMixin:
+    """Passes API requests straight to the next middleware
+
+    API authenticates with JWT only, so sessions, CSRF, session users and
+    messages are only loaded outside of API_URL_PREFIX. Classes below subclass
+    the originals, so admin checks still find them in MIDDLEWARE.
+    """
+    def __call__(self, request):
+        if request.path_info.startswith(settings.API_URL_PREFIX):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(ApiBypassMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(ApiBypassMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if request.path_info.startswith(settings.API_URL_PREFIX):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(ApiBypassMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(ApiBypassMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class DatabaseHealthCheckMiddleware:
+    """Closes persistent connections the server has dropped
+
+    With CONN_MAX_AGE connections outlive requests and may be cut by a database
+    restart or a pooler. Unusable ones are closed here, so the view opens a
+    fresh connection instead of failing on the first query.
+    """
+    def __init__(self, get_response):
+        if not settings.DB_HEALTH_CHECKS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for connection in connections.all():
+            if (
+                connection.connection is not None
+                and connection.settings_dict['CONN_MAX_AGE'] != 0
+                and not connection.is_usable()
+            ):
+                connection.close()
+        return self.get_response(request)
+
+
+class QueryRecorder:
+    """Collects queries run on all database connections"""
+    def __init__(self):
+        self.view = None
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """Total time spent in database, in milliseconds"""
+        return sum(duration for _, duration in self.queries) * 1000
+
+    @property
+    def duplicates(self):
+        """Statements run more than once, parameters aside, with their counts"""
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count > 1}
+
+
+def get_view_name(view_func, request):
+    """ViewSet name with action, e.g. TitleViewSet.list"""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    method = request.method.lower()
+    action = (getattr(view_func, 'actions', None) or {}).get(method, method)
+    return f'{view_class.__name__}.{action}'
+
+
+class QueryBudgetMiddleware:
+    """Records queries of every request and reports views over their budget
+
+    Budgets come from QUERY_BUDGETS by view name, QUERY_BUDGET_DEFAULT
+    otherwise. With QUERY_TIMING_HEADERS the numbers are sent in Server-Timing.
+    Recorder stays on response as `query_stats`, tests check budgets with it.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request.query_stats = recorder
+        with recorder.record():
+            response = self.get_response(request)
+        response.query_stats = recorder
+
+        budget = settings.QUERY_BUDGETS.get(recorder.view, settings.QUERY_BUDGET_DEFAULT)
+        if recorder.count > budget:
+            logger.warning(
+                '%s %s (%s) ran %d queries, budget is %d; duplicated: %s',
+                request.method, request.path, recorder.view, recorder.count, budget,
+                list(recorder.duplicates.values()) or 'none'
+            )
+        if settings.QUERY_TIMING_HEADERS:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration:.1f};desc="{recorder.count} queries", '
+                f'dup;desc="{sum(recorder.duplicates.values())} duplicated"'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_stats.view = get_view_name(view_func, request)
@@ -33,15 +33,55 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.middleware.DatabaseHealthCheckMiddleware',
+    'api_yamdb.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api_yamdb.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'api_yamdb.middleware.CsrfViewMiddleware',
+    'api_yamdb.middleware.AuthenticationMiddleware',
+    'api_yamdb.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Database queries allowed per request of a view, more are logged as warnings
+QUERY_BUDGET_DEFAULT = 10
+QUERY_BUDGETS = {
+    'CategoryViewSet.list': 3,
+    'CategoryViewSet.create': 4,
+    'CategoryViewSet.destroy': 6,
+    'GenreViewSet.list': 4,
+    'GenreViewSet.create': 4,
+    'GenreViewSet.destroy': 6,
+    # Title reads include reloading category and genre dictionaries after they change
+    'TitleViewSet.list': 8,
+    'TitleViewSet.retrieve': 6,
+    'TitleViewSet.create': 10,
+    'TitleViewSet.partial_update': 6,
+    'TitleViewSet.bulk': 12,
+    'TitleViewSet.destroy': 20,
+    'ReviewViewSet.list': 4,
+    'ReviewViewSet.retrieve': 3,
+    'ReviewViewSet.create': 5,
+    'ReviewViewSet.partial_update': 7,
+    'ReviewViewSet.destroy': 12,
+    'CommentViewSet.list': 4,
+    'CommentViewSet.retrieve': 3,
+    'CommentViewSet.create': 4,
+    'CommentViewSet.partial_update': 5,
+    'CommentViewSet.destroy': 6,
+    'UserViewSet.list': 3,
+    'UserViewSet.get_me': 2,
+    'UserTokenViewSet.create': 6,
+    'UserTokenViewSet.create_token': 2,
+}
+
+# Send query count and database time in Server-Timing header
+QUERY_TIMING_HEADERS = DEBUG
+
+# Requests under this prefix skip session, CSRF, session user and messages middleware
+API_URL_PREFIX = '/api/'
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -65,13 +105,74 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
-DATABASES = {
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'true').lower() in ('1', 'true', 'yes')
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            # Adds transaction_mode option, write transactions wait for each other
+            'ENGINE': 'api_yamdb.sqlite3',
+            'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE' if SQLITE_TUNING else 'DEFERRED'},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', 'yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Seconds to keep a connection open between requests, 0 closes it after each one
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        }
+    }
+    # DB_POOL=pgbouncer: connections go through PgBouncer in transaction mode,
+    # which cannot keep named cursors open between transactions
+    if os.getenv('DB_POOL') == 'pgbouncer':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Applied to every new SQLite connection: WAL lets readers work alongside a
+# writer, concurrent writers wait up to busy_timeout ms instead of failing.
+# SQLITE_TUNING=false keeps SQLite defaults
+if SQLITE_TUNING:
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': 128 * 1024 * 1024,
+        'cache_size': -16 * 1024,
+    }
+else:
+    SQLITE_PRAGMAS = {}
+
+# Check persistent connections before each request, broken ones are reopened
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes')
+
+# Cache
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'yamdb'),
     }
 }
 
+# Cached data is invalidated by versions kept in the cache. A per-process cache
+# does not see versions bumped by other processes, what it keeps must expire soon
+CACHE_IS_SHARED = CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+
+# Seconds to keep responses of catalogue endpoints, invalidated on writes anyway
+RESPONSE_CACHE_TIMEOUT = 300 if CACHE_IS_SHARED else 10
+
+# Seconds genres and categories are kept in process memory, writes of other
+# processes are seen at once only with a shared cache, see CACHE_IS_SHARED
+DICTIONARY_TTL = 10
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -91,9 +192,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedUserJWTAuthentication',
     ],
 
     'DEFAULT_PERMISSION_CLASSES': [
@@ -108,11 +207,20 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Seconds to keep counts of paginated lists, invalidated on writes anyway
+PAGINATION_COUNT_CACHE_TIMEOUT = 300 if CACHE_IS_SHARED else 10
+
+# Unfiltered lists over more rows than this get an estimated count, None disables
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = 100000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'AUTH_HEADER_TYPES': ('Bearer',)
 }
 
+# Seconds an authenticated user is kept in process memory between requests
+JWT_USER_CACHE_TTL = 30
+
 # Internationalization
 
 LANGUAGE_CODE = 'en-us'
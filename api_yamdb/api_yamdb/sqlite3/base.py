@@ -0,0 +1,19 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend with OPTIONS['transaction_mode'] of newer Django versions
+
+    With IMMEDIATE a transaction takes the write lock on BEGIN and waits for it
+    within busy_timeout. A DEFERRED one that has read first fails at once with
+    `database is locked` when another writer commits in between.
+    """
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
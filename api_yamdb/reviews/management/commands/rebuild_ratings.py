@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Recalculate stored title ratings from reviews and report drift"""
+    help = 'Rebuild rating_sum, rating_count and rating of every title from its reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report titles whose stored rating differs from reviews, exit with error on drift'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        titles = Title.objects.annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews'),
+        ).only('id', 'rating_sum', 'rating_count', 'rating')
+        drifted = []
+        for title in titles.iterator():
+            actual_rating = title.actual_sum / title.actual_count if title.actual_count else None
+            stored = (title.rating_sum, title.rating_count, title.rating)
+            if stored == (title.actual_sum, title.actual_count, actual_rating):
+                continue
+            if options['check']:
+                self.stderr.write(
+                    f'Title {title.id}: stored sum={stored[0]} count={stored[1]}, '
+                    f'actual sum={title.actual_sum} count={title.actual_count}'
+                )
+            title.rating_sum = title.actual_sum
+            title.rating_count = title.actual_count
+            title.rating = actual_rating
+            drifted.append(title)
+
+        if options['check']:
+            if drifted:
+                raise CommandError(f'Rating drift found in {len(drifted)} titles')
+            self.stdout.write(self.style.SUCCESS('All title ratings are consistent'))
+            return
+
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                drifted, ['rating_sum', 'rating_count', 'rating'], batch_size=options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating of {len(drifted)} titles'))
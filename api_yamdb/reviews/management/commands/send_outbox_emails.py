@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    """Deliver queued emails in batches, retrying failures with exponential backoff"""
+    help = 'Send pending emails from the outbox through EMAIL_BACKEND'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument(
+            '--retry-delay', type=int, default=60,
+            help='Seconds before the first retry, doubled on every next attempt'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = failed = 0
+            while True:
+                batch_sent, batch_failed = self.send_batch(options)
+                sent += batch_sent
+                failed += batch_failed
+                if batch_sent + batch_failed < options['batch_size']:
+                    break
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def claim_batch(self, options):
+        """Lease pending emails, so concurrent workers do not send them twice"""
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                    sent_at__isnull=True,
+                    send_after__lte=now,
+                    attempts__lt=options['max_attempts'],
+                ).order_by('send_after', 'id')[:options['batch_size']]
+            )
+            EmailOutbox.objects.filter(pk__in=[email.pk for email in batch]).update(
+                send_after=now + timedelta(seconds=options['retry_delay'])
+            )
+        return batch
+
+    def send_batch(self, options):
+        batch = self.claim_batch(options)
+        if not batch:
+            return 0, 0
+        now = timezone.now()
+        try:
+            connection = get_connection()
+            connection.open()
+        except Exception as error:
+            for email in batch:
+                self.reschedule(email, error, now, options)
+            return 0, len(batch)
+
+        sent = failed = 0
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.message, email.from_email or None,
+                    [email.recipient], connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    self.reschedule(email, error, now, options)
+                    failed += 1
+                else:
+                    email.sent_at = timezone.now()
+                    email.attempts += 1
+                    email.save(update_fields=['sent_at', 'attempts'])
+                    sent += 1
+        finally:
+            connection.close()
+        return sent, failed
+
+    def reschedule(self, email, error, now, options):
+        """Postpone failed email, delay grows exponentially with attempts"""
+        email.attempts += 1
+        email.last_error = repr(error)
+        email.send_after = now + timedelta(seconds=options['retry_delay'] * 2 ** (email.attempts - 1))
+        email.save(update_fields=['attempts', 'last_error', 'send_after'])
+        self.stderr.write(f'Email {email.id} to {email.recipient} failed: {email.last_error}')
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:44
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Sum
+from django.db.models.functions import Cast
+
+
+def backfill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        actual_sum=Sum(Cast('reviews__score', IntegerField())),
+        actual_count=Count('reviews'),
+    ).filter(actual_count__gt=0)
+    for title in titles.iterator():
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=title.actual_sum,
+            rating_count=title.actual_count,
+            rating=title.actual_sum / title.actual_count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='score',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6'), (7, '7'), (8, '8'), (9, '9'), (10, '10')]),
+        ),
+        migrations.RunSQL(
+            'UPDATE reviews_review SET score = CAST(score AS INTEGER)',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'score'], name='review_title_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(check=models.Q(('score__gte', 1), ('score__lte', 10)), name='review_score_range'),
+        ),
+    ]
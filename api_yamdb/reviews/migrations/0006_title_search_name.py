@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+def normalize_search(value):
+    """reviews.models.normalize_search as of this migration, later changes must not alter it"""
+    return ' '.join(value.casefold().replace('ё', 'е').split())
+
+
+def backfill_search_name(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = []
+    for title in Title.objects.only('id', 'name').iterator():
+        title.search_name = normalize_search(title.name)
+        titles.append(title)
+        if len(titles) == 1000:
+            Title.objects.bulk_update(titles, ['search_name'])
+            titles = []
+    Title.objects.bulk_update(titles, ['search_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_search_name, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Full-text indexes over review and comment text, kept in sync by triggers.
+# FTS5 is specific to SQLite, other databases get no index.
+FTS_TABLES = (('reviews_review', 'reviews_review_fts'), ('reviews_comment', 'reviews_comment_fts'))
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, fts in FTS_TABLES:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"text, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, text) VALUES ('delete', old.id, old.text); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, text) VALUES ('delete', old.id, old.text); "
+            f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, fts in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Min
+
+
+def remove_duplicate_links(apps, schema_editor):
+    """Keep the first link of every title and genre pair"""
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    first_ids = GenreTitle.objects.values('title_id', 'genre_id').annotate(first_id=Min('id')).values('first_id')
+    GenreTitle.objects.exclude(id__in=first_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_text_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_links, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='genre_title', to='reviews.Genre'),
+        ),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='genre_title', to='reviews.Title'),
+        ),
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(fields=['genre', 'title'], name='genre_title_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='genre_title_unique'),
+        ),
+    ]
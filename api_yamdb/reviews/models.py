@@ -1,7 +1,10 @@
 import datetime
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 
@@ -64,8 +67,15 @@ class Genre(models.Model):
         return self.name
 
 
+def normalize_search(value):
+    """Case and whitespace insensitive form of text used for title search"""
+    return ' '.join(value.casefold().replace('ё', 'е').split())
+
+
 class Title(models.Model):
     name = models.CharField(max_length=200, verbose_name='title_name')
+    # Normalized name, indexed for prefix search
+    search_name = models.CharField(max_length=200, db_index=True, editable=False, default='')
     year = models.IntegerField(verbose_name='creation_date')
     description = models.CharField(max_length=500, blank=True)
     category = models.ForeignKey(
@@ -75,6 +85,39 @@ class Title(models.Model):
         null=True
     )
     genre = models.ManyToManyField(Genre, through='GenreTitle')
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.FloatField(null=True, editable=False)
+    # Changed along with title, its category, genres, reviews and comments
+    version = models.PositiveIntegerField(default=1, editable=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ]
+
+    @classmethod
+    def touch(cls, **filters):
+        """Mark titles as changed, e.g. when their reviews or comments are written"""
+        cls.objects.filter(**filters).update(version=F('version') + 1, modified=timezone.now())
+
+    @classmethod
+    def apply_rating_delta(cls, title_id, score_delta, count_delta):
+        """Shift stored rating of the title in a single UPDATE statement"""
+        new_count = F('rating_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            version=F('version') + 1,
+            modified=timezone.now(),
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=new_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=Value(None)),
+                default=Cast(F('rating_sum') + score_delta, FloatField()) / new_count,
+                output_field=FloatField(),
+            ),
+        )
 
     def save(self, *args, **kwargs):
         """Check year is not negative or not in the future"""
@@ -82,13 +125,25 @@ class Title(models.Model):
             raise ValidationError("The year cannot be in the future!")
         elif self.year <= 0:
             raise ValidationError("Invalid year")
+        if not self._state.adding:
+            self.version += 1
+        self.search_name = normalize_search(self.name)
         super(Title, self).save(*args, **kwargs)
 
 
 class GenreTitle(models.Model):
     """Additional class linking titles and genres"""
-    title = models.ForeignKey(Title, on_delete=models.CASCADE, related_name='genre_title')
-    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, related_name='genre_title')
+    # Single column indexes are covered by the composite ones below
+    title = models.ForeignKey(Title, on_delete=models.CASCADE, related_name='genre_title', db_index=False)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, related_name='genre_title', db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'genre'], name='genre_title_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['genre', 'title'], name='genre_title_genre_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -96,12 +151,39 @@ class Review(models.Model):
     text = models.TextField(verbose_name='text_review')
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews')
-    score = models.CharField(max_length=2, choices=SCORE_CHOICES)
+    score = models.PositiveSmallIntegerField(choices=SCORE_CHOICES)
     pub_date = models.DateTimeField(
         'Publication date', auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = [["title", "author"]] # author can leave only one review on title
+        constraints = [
+            models.CheckConstraint(check=models.Q(score__gte=1, score__lte=10), name='review_score_range'),
+        ]
+        # Newest first as in cursor pagination, pages of a title are read from the index
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['title', 'score'], name='review_title_score_idx'),
+            models.Index(fields=['title', 'pub_date', 'id'], name='review_title_pub_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep rating of the reviewed title in sync with the saved score"""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                # Locked, so concurrent edits of the review apply their deltas one after another
+                previous = Review.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'title_id', 'score'
+                ).first()
+            super(Review, self).save(*args, **kwargs)
+            if previous is None:
+                Title.apply_rating_delta(self.title_id, int(self.score), 1)
+            elif previous[0] != self.title_id:
+                Title.apply_rating_delta(previous[0], -int(previous[1]), -1)
+                Title.apply_rating_delta(self.title_id, int(self.score), 1)
+            else:
+                Title.apply_rating_delta(self.title_id, int(self.score) - int(previous[1]), 0)
 
 
 class Comment(models.Model):
@@ -112,3 +194,27 @@ class Comment(models.Model):
         User, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField(
         'Publication date', auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'], name='comment_review_pub_date_idx'),
+        ]
+
+
+class EmailOutbox(models.Model):
+    """Email waiting for delivery by send_outbox_emails command"""
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    from_email = models.CharField(max_length=200, blank=True)
+    recipient = models.EmailField(max_length=200)
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'send_after'], name='outbox_pending_idx'),
+        ]
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+
+
+@receiver(pre_delete, sender=Review)
+def lock_deleted_review(sender, instance, **kwargs):
+    """Read the stored score under a row lock, inside the deleting transaction
+
+    A concurrent delete that got the row first leaves nothing to withdraw, and
+    a score changed after the instance was loaded is withdrawn as stored.
+    """
+    instance._rated = Review.objects.select_for_update().filter(pk=instance.pk).values_list(
+        'title_id', 'score'
+    ).first()
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating(sender, instance, **kwargs):
+    """Withdraw score of deleted review, including cascades from Title and User"""
+    rated = getattr(instance, '_rated', None)
+    if rated is not None:
+        Title.apply_rating_delta(rated[0], -int(rated[1]), -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_title(sender, instance, **kwargs):
+    """Comments are part of the title's reviews, so the title changes with them"""
+    Title.touch(reviews__id=instance.review_id)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def touch_genre_title(sender, instance, **kwargs):
+    Title.touch(pk=instance.title_id)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, **kwargs):
+    Title.touch(genre=instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, **kwargs):
+    """Before deletion, while titles still refer to the category"""
+    Title.touch(category=instance)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Set SQLITE_PRAGMAS on every new SQLite connection
+
+    Runs on the driver connection, so pragmas are not counted as request queries.
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
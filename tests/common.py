@@ -113,3 +113,14 @@ def create_comments(admin_client, admin):
     result.append({'id': create_comment(client_moderator, titles[0]["id"], reviews[0]["id"], 'qwerty321'),
                    'author': moderator.username, 'text': 'qwerty321'})
     return result, reviews, titles, user, moderator
+
+
+def assert_query_budget(response):
+    from django.conf import settings
+
+    stats = response.query_stats
+    budget = settings.QUERY_BUDGETS.get(stats.view, settings.QUERY_BUDGET_DEFAULT)
+    assert stats.count <= budget, (
+        f'Проверьте количество запросов к базе в `{stats.view}`: {stats.count} при бюджете {budget}. '
+        f'Повторяющиеся запросы: {list(stats.duplicates)}'
+    )
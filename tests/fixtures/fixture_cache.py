@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.authentication import clear_user_cache
+    from api.caching import clear_dictionaries
+    from django.core.cache import cache
+
+    cache.clear()
+    clear_user_cache()
+    clear_dictionaries()
+    yield
+    cache.clear()
+    clear_user_cache()
+    clear_dictionaries()
@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что при создании отзыва рейтинг произведения пересчитывается'
+        )
+
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.score = 8
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (15, 3, 5), (
+            'Проверьте, что при изменении оценки рейтинг произведения пересчитывается'
+        )
+
+        review.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (7, 2, 3.5), (
+            'Проверьте, что при удалении отзыва рейтинг произведения пересчитывается'
+        )
+
+        user.delete()
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None), (
+            'Проверьте, что при каскадном удалении отзывов рейтинг произведения пересчитывается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings(self, admin_client, admin):
+        from django.core.management.base import CommandError
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(rating_sum=0, rating_count=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает рейтинг произведения'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stale_review_instances(self, admin_client, admin):
+        from reviews.models import Review
+
+        reviews, _, _, _ = create_reviews(admin_client, admin)
+        loaded = Review.objects.get(pk=reviews[0]['id'])
+        changed = Review.objects.get(pk=reviews[0]['id'])
+        changed.score = 9
+        changed.save()
+        # Deleted with the score stored now, not the one loaded before the change
+        loaded.delete()
+        call_command('rebuild_ratings', '--check')
+
+        # The row is gone already, as after a concurrent delete
+        changed.delete()
+        call_command('rebuild_ratings', '--check')
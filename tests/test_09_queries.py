@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test09QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_list(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        expected = count_queries(client, '/api/v1/titles/')
+        assert expected <= 5, (
+            'Проверьте, что GET запрос `/api/v1/titles/` загружает категории и жанры '
+            'без отдельного запроса на каждое произведение'
+        )
+        for i in range(10):
+            data = {'name': f'Произведение {i}', 'year': 2000 + i,
+                    'genre': [genres[0]['slug'], genres[2]['slug']], 'category': categories[0]['slug']}
+            admin_client.post('/api/v1/titles/', data=data)
+        assert count_queries(client, '/api/v1/titles/') == expected, (
+            'Проверьте, что число запросов к базе при GET запросе `/api/v1/titles/` '
+            'не зависит от количества произведений на странице'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_create(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        data = {'text': 'Текст отзыва', 'score': 7}
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data=data)
+        assert response.status_code == 201
+        title_selects = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_selects) == 1, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/` '
+            'произведение загружается из базы один раз'
+        )
+        assert len(context.captured_queries) <= 5, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/` '
+            'повторный отзыв отсекается ограничением уникальности, без отдельного запроса'
+        )
+        response = user_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на то же произведение возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reviews_list(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        assert count_queries(client, f'/api/v1/titles/{titles[0]["id"]}/reviews/') == 3, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/reviews/` загружает авторов '
+            'без отдельного запроса на каждый отзыв'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comments_list(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        assert count_queries(client, url) == 3, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'загружает авторов без отдельного запроса на каждый комментарий'
+        )
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии к отзыву недоступны по адресу другого произведения'
+        )
@@ -0,0 +1,93 @@
+import pytest
+
+from .common import create_genre, create_reviews
+
+
+class Test10Pagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor(self, client, admin_client, admin, monkeypatch):
+        from api.pagination import PubDateCursorPagination
+
+        monkeypatch.setattr(PubDateCursorPagination, 'page_size', 2)
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        assert response.json()['count'] == 3, (
+            'Проверьте, что без параметра `pagination` используется пагинация по номеру страницы'
+        )
+
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            'Проверьте, что с параметром `pagination=cursor` используется пагинация по курсору'
+        )
+        ids = [review['id'] for review in data['results']]
+        data = client.get(data['next']).json()
+        ids += [review['id'] for review in data['results']]
+        assert data['next'] is None
+        assert ids == sorted((review['id'] for review in reviews), reverse=True), (
+            'Проверьте, что пагинация по курсору возвращает отзывы от новых к старым без пропусков'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cached_count(self, client, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_genre(admin_client)
+        data = client.get('/api/v1/genres/').json()
+        assert data['count'] == 3 and data['count_is_exact'] is True, (
+            'Проверьте, что ответ `/api/v1/genres/` содержит точное количество объектов `count_is_exact`'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/genres/')
+        assert not [query for query in context.captured_queries if 'COUNT(' in query['sql']], (
+            'Проверьте, что количество объектов берётся из кэша при повторном запросе'
+        )
+        admin_client.post('/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'})
+        assert client.get('/api/v1/genres/').json()['count'] == 4, (
+            'Проверьте, что кэш количества объектов сбрасывается при изменении модели'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_estimated_count(self, client, admin_client, settings):
+        from django.db import connection
+
+        from reviews.models import Genre
+
+        settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD = 2
+        create_genre(admin_client)
+        if connection.vendor == 'postgresql':
+            # pg_class.reltuples stays 0 or -1 until the table is analyzed
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(Genre._meta.db_table)}')
+        data = client.get('/api/v1/genres/').json()
+        assert data['count'] >= 3 and data['count_is_exact'] is False, (
+            'Проверьте, что для больших таблиц без фильтров количество объектов оценивается'
+        )
+        data = client.get('/api/v1/genres/', {'search': 'Драма'}).json()
+        assert data['count'] == 1 and data['count_is_exact'] is True
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_page_number_order(self, client, admin_client, admin):
+        from django.db import connection
+
+        from reviews.models import Review
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        data = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/').json()
+        assert [review['id'] for review in data['results']] == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), 'Проверьте, что отзывы на странице идут от новых к старым'
+
+        if connection.vendor == 'sqlite':
+            queryset = Review.objects.filter(title_id=titles[0]['id'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {queryset.query}')
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            assert 'review_title_pub_date_idx' in plan and 'TEMP B-TREE' not in plan, (
+                'Проверьте, что отзывы произведения читаются по индексу без сортировки'
+            )
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+
+class Test11EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client, settings, tmp_path):
+        from reviews.models import EmailOutbox, User
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        response = client.post(self.url_signup, data={'email': 'queued@yamdb.fake', 'username': 'queued'})
+        assert response.status_code == 200
+        assert not os.listdir(tmp_path), (
+            'Проверьте, что письмо с кодом подтверждения не отправляется во время запроса'
+        )
+        email = EmailOutbox.objects.get(recipient='queued@yamdb.fake')
+        assert email.sent_at is None
+
+        call_command('send_outbox_emails')
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        sent = [open(tmp_path / name).read() for name in os.listdir(tmp_path)]
+        assert len(sent) == 1 and User.objects.get(username='queued').confirmation_code in sent[0], (
+            'Проверьте, что команда `send_outbox_emails` отправляет письмо с кодом подтверждения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_is_retried(self, settings, tmp_path):
+        from django.utils import timezone
+        from reviews.models import EmailOutbox
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        not_a_directory = tmp_path / 'file'
+        not_a_directory.write_text('')
+        settings.EMAIL_FILE_PATH = str(not_a_directory)
+        email = EmailOutbox.objects.create(subject='Тема', message='Текст', recipient='retry@yamdb.fake')
+
+        call_command('send_outbox_emails', '--retry-delay', '60')
+        email.refresh_from_db()
+        assert email.sent_at is None and email.attempts == 1 and email.last_error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается до следующей попытки'
+        )
+
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        EmailOutbox.objects.filter(pk=email.pk).update(send_after=timezone.now())
+        call_command('send_outbox_emails')
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_signup_user_and_email_commit_together(self, client, monkeypatch):
+        from django.db import DatabaseError
+
+        from reviews.models import EmailOutbox, User
+
+        def fail(**kwargs):
+            raise DatabaseError('outbox is not available')
+
+        monkeypatch.setattr(EmailOutbox.objects, 'create', fail)
+        with pytest.raises(DatabaseError):
+            client.post(self.url_signup, data={'email': 'lost@yamdb.fake', 'username': 'lost'})
+        assert not User.objects.filter(username='lost').exists(), (
+            'Проверьте, что пользователь не сохраняется без письма с кодом подтверждения'
+        )
@@ -0,0 +1,26 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test12ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self):
+        from reviews.models import Comment, GenreTitle, Review, Title, User
+
+        call_command('import_csv', '--batch-size', '7')
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72 and Comment.objects.count() == 3, (
+            'Проверьте, что команда `import_csv` загружает все строки из static/data'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019 and review.score == 10, (
+            'Проверьте, что команда `import_csv` сохраняет дату публикации и оценку из файла'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count() and title.rating is not None, (
+            'Проверьте, что после импорта рейтинг произведений пересчитан'
+        )
+        call_command('rebuild_ratings', '--check')
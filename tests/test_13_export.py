@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+
+
+class Test13Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_command(self):
+        call_command('import_csv')
+        for name, filename in (('titles', 'titles.csv'), ('reviews', 'review.csv'), ('comments', 'comments.csv')):
+            out = io.StringIO()
+            call_command('export', name, stdout=out)
+            with open(os.path.join(MANAGE_PATH, 'static', 'data', filename), encoding='utf-8', newline='') as file:
+                header, *expected = csv.reader(file)
+            exported = list(csv.reader(io.StringIO(out.getvalue())))
+            assert exported[0] == header and exported[1:] == sorted(expected, key=lambda row: int(row[0])), (
+                f'Проверьте, что команда `export {name}` выгружает данные в формате static/data/{filename}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_endpoint(self, client, user_client, admin_client):
+        call_command('import_csv')
+        url = '/api/v1/export/reviews/'
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403, (
+            'Проверьте, что выгрузка данных доступна только администратору'
+        )
+        response = admin_client.get(url, {'output': 'ndjson'})
+        assert response.status_code == 200 and response.streaming, (
+            'Проверьте, что выгрузка данных отдаётся потоком'
+        )
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert len(rows) == 72 and rows[0]['pub_date'] == '2019-09-24T21:08:21.567Z'
+        assert admin_client.get(url, {'output': 'xml'}).status_code == 400
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test14ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cached(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200 and len(context.captured_queries) == 1, (
+            'Проверьте, что повторный GET запрос `/api/v1/titles/{title_id}/` отдаётся из кэша, '
+            'а из базы читается только версия произведения'
+        )
+        user_client.post(f'{url}reviews/', data={'text': 'Отзыв', 'score': 6})
+        assert client.get(url).json()['rating'] == 6, (
+            'Проверьте, что кэш произведения сбрасывается при добавлении отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_categories_cached(self, client, admin_client):
+        create_titles(admin_client)
+        assert client.get('/api/v1/categories/').json()['count'] == 2
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/categories/')
+        assert not context.captured_queries
+        admin_client.delete('/api/v1/categories/books/')
+        data = client.get('/api/v1/categories/').json()
+        assert data['count'] == 1 and data['results'][0]['slug'] == 'films', (
+            'Проверьте, что кэш категорий сбрасывается при удалении категории'
+        )
+        data = client.get('/api/v1/titles/').json()
+        assert {title['category'] and title['category']['slug'] for title in data['results']} == {'films', None}, (
+            'Проверьте, что кэш произведений сбрасывается при удалении категории'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_versions_bumped_after_commit(self):
+        from django.db import transaction
+
+        from api.caching import get_model_versions
+        from reviews.models import Genre
+
+        versions = get_model_versions([Genre])
+        with transaction.atomic():
+            Genre.objects.create(name='Вестерн', slug='western')
+            assert get_model_versions([Genre]) == versions, (
+                'Проверьте, что версия кэша меняется только после фиксации транзакции'
+            )
+        assert get_model_versions([Genre]) != versions
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test15ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_not_modified(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            'Проверьте, что ответ `/api/v1/titles/{title_id}/reviews/` содержит заголовки ETag и Last-Modified'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304 and len(context.captured_queries) == 1, (
+            'Проверьте, что для неизменившегося списка отзывов возвращается статус 304 '
+            'после одного запроса к базе'
+        )
+        admin_client.post(f'{url}{reviews[0]["id"]}/comments/', data={'text': 'Ещё комментарий'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что ETag списка отзывов меняется при добавлении комментария'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_not_modified(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        detail_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(detail_url)
+        assert client.get(detail_url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+        response = client.get(detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == 304, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/` учитывает заголовок If-Modified-Since'
+        )
+
+        response = client.get('/api/v1/titles/', {'genre': 'drama'})
+        etag = response['ETag']
+        assert client.get('/api/v1/titles/', {'genre': 'drama'}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что ETag списка произведений зависит от фильтров'
+        )
+        admin_client.patch('/api/v1/genres/drama/', data={'name': 'Трагедия'})
+        response = client.get('/api/v1/titles/', {'genre': 'drama'}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag списка произведений меняется при переименовании жанра'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_titles_list_after_delete(self, client, admin_client, admin):
+        from django.utils.http import http_date
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get('/api/v1/titles/')
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что список произведений не отдаёт Last-Modified, он не меняется при удалении'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get('/api/v1/titles/', HTTP_IF_MODIFIED_SINCE=http_date())
+        assert response.status_code == 200
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag списка произведений меняется при удалении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_titles_validators_match_cached_body(self, client, admin_client, admin):
+        from django.db.models import F
+
+        from reviews.models import Title
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200 and not context.captured_queries, (
+            'Проверьте, что закэшированный список произведений отдаётся без запросов к базе'
+        )
+
+        detail_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(detail_url)['ETag']
+        # Written by a process whose cache this one does not see
+        Title.objects.filter(pk=titles[0]['id']).update(name='Переименовано', version=F('version') + 1)
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['name'] == 'Переименовано', (
+            'Проверьте, что новый ETag произведения не отдаётся с устаревшим закэшированным телом'
+        )
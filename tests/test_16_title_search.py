@@ -0,0 +1,37 @@
+import pytest
+from django.db import IntegrityError
+
+from .common import create_titles
+
+
+class Test16TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_name_prefix(self, client, admin_client):
+        create_titles(admin_client)
+        for query in ('поворот', 'ПОВОРОТ  Т', 'Поворот туда'):
+            data = client.get('/api/v1/titles/', {'name': query}).json()
+            assert [title['name'] for title in data['results']] == ['Поворот туда'], (
+                'Проверьте, что фильтр `name` ищет произведения по началу названия без учёта регистра'
+            )
+        admin_client.patch(f'/api/v1/titles/{data["results"][0]["id"]}/', data={'name': 'Ёлка'})
+        assert client.get('/api/v1/titles/', {'name': 'елк'}).json()['count'] == 1, (
+            'Проверьте, что поисковое поле обновляется при изменении названия'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genre_exact_without_duplicates(self, client, admin_client):
+        from reviews.models import Genre, GenreTitle, Title
+
+        titles, _, _ = create_titles(admin_client)
+        with pytest.raises(IntegrityError):
+            GenreTitle.objects.create(
+                title=Title.objects.get(pk=titles[0]['id']), genre=Genre.objects.get(slug='horror')
+            )
+        data = client.get('/api/v1/titles/', {'genre': 'horror'}).json()
+        assert data['count'] == 1 and len(data['results']) == 1, (
+            'Проверьте, что фильтр `genre` не дублирует произведения'
+        )
+        assert client.get('/api/v1/titles/', {'genre': 'hor'}).json()['count'] == 0, (
+            'Проверьте, что фильтр `genre` сравнивает slug целиком'
+        )
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+
+from .common import create_comments
+
+
+class Test17TextSearch:
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='Full-text search needs SQLite FTS5')
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_reviews_and_comments(self, client, admin_client, admin, monkeypatch):
+        from api.views import SearchView
+        from reviews.models import Comment, Review
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        assert client.get('/api/v1/search/').status_code == 400
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.text = 'Отличный фильм <b>про</b> космос и космонавтов'
+        review.save()
+        Comment.objects.create(review=review, author=admin, text='Космос здесь показан плохо')
+
+        data = client.get('/api/v1/search/', {'q': 'КОСМОС'}).json()
+        found = {(result['type'], result['title_id']) for result in data['results']}
+        assert found == {('review', titles[0]['id']), ('comment', titles[0]['id'])}, (
+            'Проверьте, что `/api/v1/search/?q=` находит отзывы и комментарии без учёта регистра'
+        )
+        snippet = next(result['snippet'] for result in data['results'] if result['type'] == 'review')
+        assert '<mark>космос</mark>' in snippet and '&lt;b&gt;' in snippet, (
+            'Проверьте, что найденные слова подсвечены, а текст отзыва экранирован'
+        )
+
+        review.delete()
+        data = client.get('/api/v1/search/', {'q': 'космос'}).json()
+        assert data['results'] == [], (
+            'Проверьте, что удалённые отзывы и комментарии не находятся поиском'
+        )
+        assert client.get('/api/v1/search/', {'q': 'qwerty"'}).status_code == 200
+
+        monkeypatch.setattr(SearchView, 'page_size', 1)
+        data = client.get('/api/v1/search/', {'q': 'qwerty'}).json()
+        assert len(data['results']) == 1 and data['next'] and data['previous'] is None
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1 and data['previous'], (
+            'Проверьте, что результаты поиска разбиты на страницы'
+        )
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='Full-text search needs SQLite FTS5')
+    @pytest.mark.django_db(transaction=True)
+    def test_02_pages_merge_reviews_and_comments(self, client, admin_client, admin, monkeypatch):
+        from urllib.parse import urlencode
+
+        from api.views import SearchView
+        from reviews.models import Comment, Review
+
+        _, reviews, _, _, _ = create_comments(admin_client, admin)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        for number in range(5):
+            Comment.objects.create(review=review, author=admin, text='звезда ' * (number + 1))
+        Review.objects.filter(pk=review.pk).update(text='звезда и ещё звезда')
+
+        everything = client.get('/api/v1/search/', {'q': 'звезда'}).json()['results']
+        assert {result['type'] for result in everything} == {'review', 'comment'}
+        assert [result['rank'] for result in everything] == sorted(
+            (result['rank'] for result in everything), reverse=True
+        ), 'Проверьте, что результаты поиска упорядочены по релевантности'
+
+        monkeypatch.setattr(SearchView, 'page_size', 2)
+        paged, url = [], '/api/v1/search/?' + urlencode({'q': 'звезда'})
+        while url:
+            data = client.get(url).json()
+            paged.extend(data['results'])
+            url = data['next']
+        assert paged == everything, (
+            'Проверьте, что страницы поиска вместе дают все результаты без повторов и пропусков'
+        )
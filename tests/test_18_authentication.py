@@ -0,0 +1,92 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class Test18CachedAuthentication:
+
+    def obtain_client(self, user):
+        response = APIClient().post('/api/v1/auth/token/', data={
+            'username': user.username, 'confirmation_code': user.confirmation_code
+        })
+        assert response.status_code == 200
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()}')
+        return client
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_user(self, admin_client, django_user_model):
+        user = django_user_model.objects.create_user(
+            username='CachedUser', email='cached@yamdb.fake', role='user', confirmation_code='code'
+        )
+        user_client = self.obtain_client(user)
+        assert user_client.get('/api/v1/users/').status_code == 403
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/users/')
+        assert response.status_code == 403 and not context.captured_queries, (
+            'Проверьте, что пользователь берётся из кэша без запроса к базе'
+        )
+
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что после смены роли токен не даёт устаревших прав'
+        )
+        assert user_client.get('/api/v1/users/me/').json()['email'] == 'cached@yamdb.fake'
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя перестаёт действовать'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_api_skips_browser_middleware(self, client):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert not hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что запросы к API не загружают сессию'
+        )
+        response = client.get('/admin/login/')
+        assert response.status_code == 200 and hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что админка по-прежнему работает с сессиями'
+        )
+        assert 'csrftoken' in response.cookies
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_changes_seen_after_ttl(self, django_user_model, settings):
+        """Changes made by other processes, which cannot drop the cache entry"""
+        user = django_user_model.objects.create_user(
+            username='StaleUser', email='stale@yamdb.fake', role='admin', confirmation_code='code'
+        )
+        user_client = self.obtain_client(user)
+        settings.JWT_USER_CACHE_TTL = 0
+
+        django_user_model.objects.filter(pk=user.pk).update(role='user')
+        cache.clear()
+        assert user_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что права пользователя не берутся из токена'
+        )
+
+        django_user_model.objects.filter(pk=user.pk).update(is_active=False)
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен деактивированного пользователя перестаёт действовать'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_expired_users_evicted(self, django_user_model, settings):
+        from api.authentication import _users
+
+        settings.JWT_USER_CACHE_TTL = 0
+        clients = [
+            self.obtain_client(django_user_model.objects.create_user(
+                username=f'Holder{number}', email=f'holder{number}@yamdb.fake', confirmation_code='code'
+            ))
+            for number in range(3)
+        ]
+        for client in clients:
+            assert client.get('/api/v1/users/me/').status_code == 200
+        assert len(_users) == 1, (
+            'Проверьте, что пользователи с истёкшим сроком удаляются из кэша'
+        )
@@ -0,0 +1,54 @@
+import pytest
+
+from .common import assert_query_budget, auth_client, create_comments
+
+
+class Test19QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_viewset_actions(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        comment_url = f'{review_url}comments/{comments[0]["id"]}/'
+        requests = [
+            (client.get, '/api/v1/categories/'),
+            (admin_client.post, '/api/v1/categories/', {'name': 'Музыка', 'slug': 'music'}),
+            (admin_client.delete, '/api/v1/categories/music/'),
+            (client.get, '/api/v1/genres/'),
+            (admin_client.post, '/api/v1/genres/', {'name': 'Вестерн', 'slug': 'western'}),
+            (admin_client.delete, '/api/v1/genres/western/'),
+            (client.get, '/api/v1/titles/'),
+            (client.get, title_url),
+            (admin_client.post, '/api/v1/titles/',
+             {'name': 'Новое', 'year': 2001, 'genre': ['horror', 'drama'], 'category': 'films'}),
+            (admin_client.patch, title_url, {'description': 'Описание'}),
+            (client.get, f'{title_url}reviews/'),
+            (client.get, review_url),
+            (auth_client(user).post, f'/api/v1/titles/{titles[1]["id"]}/reviews/', {'text': 'Отзыв', 'score': 3}),
+            (admin_client.patch, review_url, {'score': 2}),
+            (client.get, f'{review_url}comments/'),
+            (client.get, comment_url),
+            (admin_client.post, f'{review_url}comments/', {'text': 'Комментарий'}),
+            (admin_client.patch, comment_url, {'text': 'Исправленный комментарий'}),
+            (admin_client.delete, comment_url),
+            (admin_client.get, '/api/v1/users/'),
+            (admin_client.get, '/api/v1/users/me/'),
+            (client.post, '/api/v1/auth/signup/', {'username': 'budget', 'email': 'budget@yamdb.fake'}),
+            (admin_client.delete, review_url),
+            (admin_client.delete, title_url),
+        ]
+        for method, url, *data in requests:
+            response = method(url, *data)
+            assert response.status_code < 400, f'{url}: {response.status_code}'
+            assert_query_budget(response)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_server_timing(self, client, settings):
+        settings.QUERY_TIMING_HEADERS = True
+        response = client.get('/api/v1/genres/')
+        assert response['Server-Timing'].startswith('db;dur='), (
+            'Проверьте, что время работы с базой передаётся в заголовке Server-Timing'
+        )
+        settings.QUERY_TIMING_HEADERS = False
+        assert 'Server-Timing' not in client.get('/api/v1/genres/')
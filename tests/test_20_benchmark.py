@@ -0,0 +1,37 @@
+import pytest
+
+from api.benchmark import compare, default_endpoints, run_endpoint, seed
+from reviews.models import Comment, Review, Title
+
+
+class Test20Benchmark:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_seed_and_run(self):
+        seed(users=5, categories=2, genres=3, titles=6, reviews_per_title=3, comments_per_review=1)
+        assert Title.objects.count() == 6, 'Проверьте, что seed создаёт заданное число произведений'
+        assert Review.objects.count() == 18, 'Проверьте, что seed создаёт отзывы на каждое произведение'
+        assert Comment.objects.count() == 18, 'Проверьте, что seed создаёт комментарии к каждому отзыву'
+        assert not Title.objects.filter(rating=None).exists(), (
+            'Проверьте, что seed пересчитывает рейтинги произведений'
+        )
+
+        endpoints = default_endpoints(titles=6, reviews_per_title=3)
+        for name, url_for in endpoints.items():
+            result = run_endpoint(url_for, requests=6, concurrency=2)
+            assert result['requests'] == 6, f'Проверьте, что все запросы к `{name}` выполнены'
+            assert result['p50'] <= result['p95'] <= result['p99'], (
+                f'Проверьте порядок перцентилей задержки `{name}`'
+            )
+            assert result['queries'] >= 0 and result['db_ms'] >= 0
+
+    def test_02_compare(self):
+        baseline = {'titles list': {'p95': 10.0, 'queries': 2}}
+        assert compare({'titles list': {'p95': 11.0, 'queries': 2}}, baseline, 0.2) == []
+        assert len(compare({'titles list': {'p95': 13.0, 'queries': 2}}, baseline, 0.2)) == 1, (
+            'Проверьте, что рост p95 сверх допуска считается регрессией'
+        )
+        assert len(compare({'titles list': {'p95': 10.0, 'queries': 3}}, baseline, 0.2)) == 1, (
+            'Проверьте, что рост числа запросов считается регрессией'
+        )
+        assert compare({'search': {'p95': 100.0, 'queries': 9}}, baseline, 0.2) == []
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+from django.db import OperationalError, connection, transaction
+
+from api_yamdb.middleware import DatabaseHealthCheckMiddleware
+
+
+class Test21Database:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_health_check_closes_broken_connection(self, settings, monkeypatch):
+        settings.DB_HEALTH_CHECKS = True
+        middleware = DatabaseHealthCheckMiddleware(lambda request: 'response')
+        connection.ensure_connection()
+        monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 60)
+
+        closed = []
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(connection.alias))
+        assert middleware(None) == 'response'
+        assert closed == [], (
+            'Проверьте, что рабочее соединение с базой не закрывается перед запросом'
+        )
+
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        middleware(None)
+        assert closed == [connection.alias], (
+            'Проверьте, что сломанное постоянное соединение закрывается перед запросом'
+        )
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite tuning only')
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sqlite_tuning(self, settings):
+        settings.SQLITE_PRAGMAS = {'busy_timeout': 1234, 'synchronous': 'NORMAL'}
+        new_connection = connection.copy()
+        try:
+            with new_connection.cursor() as cursor:
+                cursor.execute('PRAGMA busy_timeout')
+                assert cursor.fetchone()[0] == 1234, (
+                    'Проверьте, что SQLITE_PRAGMAS применяются к каждому новому соединению'
+                )
+                cursor.execute('PRAGMA synchronous')
+                assert cursor.fetchone()[0] == 1
+        finally:
+            new_connection.close()
+
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record), transaction.atomic():
+            pass
+        assert statements[0] == f'BEGIN {connection.transaction_mode}', (
+            'Проверьте, что транзакции SQLite начинаются в режиме из OPTIONS["transaction_mode"]'
+        )
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite tuning only')
+    @pytest.mark.django_db(transaction=True)
+    def test_03_concurrent_writers(self, settings, tmp_path):
+        settings.SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 5000}
+        path = str(tmp_path / 'writers.sqlite3')
+        writers, writes = 8, 20
+        errors = []
+
+        def open_connection():
+            # Connections of the test database point to memory, writers need a file
+            new_connection = connection.copy()
+            new_connection.settings_dict.update(NAME=path, OPTIONS={'transaction_mode': 'IMMEDIATE'})
+            return new_connection
+
+        def write():
+            writer = open_connection()
+            try:
+                for _ in range(writes):
+                    # What atomic() does on SQLite: BEGIN IMMEDIATE, then read and write
+                    writer.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+                    with writer.cursor() as cursor:
+                        cursor.execute('SELECT COUNT(*) FROM counter')
+                        cursor.execute('INSERT INTO counter (value) VALUES (%s)', [cursor.fetchone()[0]])
+                    writer.commit()
+                    writer.set_autocommit(True)
+            except OperationalError as error:
+                errors.append(str(error))
+            finally:
+                writer.close()
+
+        setup = open_connection()
+        with setup.cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (value integer NOT NULL UNIQUE)')
+        setup.close()
+        threads = [threading.Thread(target=write) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, (
+            f'Проверьте, что одновременные записи ждут друг друга, а не падают: {errors[0]}'
+        )
+        setup = open_connection()
+        with setup.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM counter')
+            assert cursor.fetchone()[0] == writers * writes
+        setup.close()
@@ -0,0 +1,97 @@
+import pytest
+
+from .common import create_categories, create_genre, create_titles
+
+
+class Test22BulkTitles:
+    url = '/api/v1/titles/bulk/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, client, admin_client, user_client):
+        from django.db import connection
+
+        from reviews.models import GenreTitle, Title
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        client.get('/api/v1/titles/')
+        data = [
+            {'name': f'Серия {number}', 'year': 2000 + number, 'genre': ['horror', 'drama', 'horror'],
+             'category': 'films'}
+            for number in range(5)
+        ]
+        assert user_client.post(self.url, data, format='json').status_code == 403, (
+            'Проверьте, что массово создавать произведения может только администратор'
+        )
+
+        response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{self.url}` со списком произведений возвращает статус 201'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [title['name'] for title in data]
+        assert all(sorted(title['genre']) == ['drama', 'horror'] for title in results), (
+            'Проверьте, что в ответе возвращаются жанры созданных произведений'
+        )
+        ids = [title['id'] for title in results]
+        assert Title.objects.get(pk=ids[3]).search_name == 'серия 3'
+        assert GenreTitle.objects.filter(title_id__in=ids).count() == 10
+        assert client.get('/api/v1/titles/').json()['count'] == 5, (
+            'Проверьте, что после массового создания список произведений не отдаётся из устаревшего кэша'
+        )
+        # SQLite returns no ids from bulk insert, titles are inserted one by one there
+        budget = 10 if connection.features.can_return_ids_from_bulk_insert else 10 + len(data)
+        assert response.query_stats.count <= budget, (
+            'Проверьте, что число запросов массового создания не зависит от числа произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_create_invalid(self, admin_client):
+        from reviews.models import Title
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        data = [
+            {'name': 'Хорошее', 'year': 2000, 'genre': ['horror'], 'category': 'films'},
+            {'name': 'Плохое', 'year': 3000, 'genre': ['unknown'], 'category': 'cars'},
+        ]
+        response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and {'year', 'genre', 'category'} <= set(errors[1]), (
+            'Проверьте, что ошибки массового создания возвращаются для каждого произведения'
+        )
+        assert not Title.objects.exists(), 'Проверьте, что при ошибке не создаётся ни одно произведение'
+        assert admin_client.post(self.url, data[0], format='json').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_update(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        versions = dict(Title.objects.values_list('id', 'version'))
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        data = [
+            {'id': titles[1]['id'], 'name': 'Проект два'},
+            {'id': titles[0]['id'], 'genre': ['drama'], 'category': 'books'},
+        ]
+        response = admin_client.patch(self.url, data, format='json')
+        assert response.status_code == 200, (
+            f'Проверьте, что PATCH запрос `{self.url}` со списком произведений возвращает статус 200'
+        )
+        results = response.json()
+        assert results[0]['name'] == 'Проект два' and results[0]['genre'] == ['drama']
+        assert results[1]['genre'] == ['drama'] and results[1]['category'] == 'books'
+        assert Title.objects.get(pk=titles[1]['id']).search_name == 'проект два'
+        assert all(
+            version == versions[pk] + 1 for pk, version in Title.objects.values_list('id', 'version')
+        ), 'Проверьте, что массовое изменение увеличивает версию произведений'
+        detail = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert [genre['slug'] for genre in detail['genre']] == ['drama'], (
+            'Проверьте, что после массового изменения произведение не отдаётся из устаревшего кэша'
+        )
+
+        response = admin_client.patch(self.url, [{'id': 0, 'name': 'Нет'}], format='json')
+        assert response.status_code == 400
+        response = admin_client.patch(self.url, [{'name': 'Без id'}], format='json')
+        assert response.status_code == 400
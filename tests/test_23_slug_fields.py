@@ -0,0 +1,78 @@
+import pytest
+
+from .common import create_categories, create_genre
+
+
+class Test23SlugFields:
+    url = '/api/v1/titles/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_missing_slugs(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+        data = {'name': 'Фильм', 'year': 2000, 'genre': ['horror', 'western', 'noir', 'western'],
+                'category': 'films'}
+        response = admin_client.post(self.url, data=data)
+        assert response.status_code == 400
+        errors = response.json()['genre']
+        assert len(errors) == 1 and 'western' in errors[0] and 'noir' in errors[0], (
+            'Проверьте, что все несуществующие жанры перечислены в одной ошибке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_slugs_from_dictionary(self, admin_client):
+        from reviews.models import Genre
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        data = {'name': 'Фильм', 'year': 2000, 'genre': ['horror', 'drama'], 'category': 'films'}
+        admin_client.post(self.url, data=data)
+        response = admin_client.post(self.url, data=data)
+        assert response.status_code == 201
+        resolving = [
+            sql for sql, _ in response.query_stats.queries
+            if '"slug" = ' in sql or '"slug" IN ' in sql
+        ]
+        assert resolving == [], (
+            'Проверьте, что жанры и категории берутся из кэша в памяти процесса без запросов к базе'
+        )
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'})
+        data['genre'] = ['western']
+        response = admin_client.post(self.url, data=data)
+        assert response.status_code == 201, 'Проверьте, что кэш жанров обновляется после создания жанра'
+
+        Genre.objects.filter(slug='western').delete()
+        response = admin_client.post(self.url, data=data)
+        assert response.status_code == 400, 'Проверьте, что кэш жанров обновляется после удаления жанра'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_slugs_written_by_other_process(self, admin_client):
+        from django.db import connection
+
+        from api.caching import get_dictionary
+        from reviews.models import Genre
+
+        create_genre(admin_client)
+        create_categories(admin_client)
+        data = {'name': 'Фильм', 'year': 2000, 'genre': ['horror'], 'category': 'films'}
+        assert admin_client.post(self.url, data=data).status_code == 201
+
+        # Written without signals, as another process with its own cache would do
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        data['genre'] = ['western']
+        response = admin_client.post(self.url, data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что жанр, которого нет в кэше, ищется в базе'
+        )
+
+        for url, payload in ((self.url, {**data, 'genre': ['noir']}),
+                             (f'{self.url}bulk/', [{**data, 'genre': ['noir']}])):
+            Genre.objects.bulk_create([Genre(name='Нуар', slug='noir')])
+            get_dictionary(Genre, reload=True)
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {Genre._meta.db_table} WHERE slug = %s', ['noir'])
+            response = admin_client.post(url, data=payload, format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}` отвечает 400 на жанр, удалённый другим процессом'
+            )
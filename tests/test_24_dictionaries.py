@@ -0,0 +1,90 @@
+import pytest
+
+from .common import create_titles
+
+
+def dictionary_queries(response):
+    return [
+        sql for sql, _ in response.query_stats.queries
+        if 'FROM "reviews_genre"' in sql or 'FROM "reviews_category"' in sql
+        or 'JOIN "reviews_genre"' in sql or 'JOIN "reviews_category"' in sql
+    ]
+
+
+class Test24Dictionaries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_without_dictionary_queries(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+
+        response = client.get('/api/v1/titles/', {'page': 1})
+        assert dictionary_queries(response) == [], (
+            'Проверьте, что категории и жанры произведений берутся из кэша в памяти процесса'
+        )
+        title = next(title for title in response.json()['results'] if title['id'] == titles[0]['id'])
+        assert title['category'] == categories[0]
+        assert title['genre'] == [genres[0], genres[1]]
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert dictionary_queries(response) == []
+        assert response.json()['genre'] == [genres[2]] and response.json()['category'] == categories[1]
+
+        for params, expected in (
+            ({'category': 'books'}, [titles[1]['id']]),
+            ({'genre': 'comedy'}, [titles[0]['id']]),
+            ({'genre': 'western'}, []),
+            ({'category': 'cars'}, []),
+        ):
+            response = client.get('/api/v1/titles/', params)
+            assert [title['id'] for title in response.json()['results']] == expected, (
+                f'Проверьте фильтрацию произведений по `{params}`'
+            )
+            assert dictionary_queries(response) == [], (
+                'Проверьте, что фильтр произведений находит категорию и жанр по slug без запросов к ним'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_dictionary_invalidation(self, client, admin_client):
+        from reviews.models import Category, Genre
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        category = Category.objects.get(slug='films')
+        category.name = 'Кино'
+        category.save()
+        data = client.get(url).json()
+        assert data['genre'][0]['name'] == 'Хоррор' and data['category']['name'] == 'Кино', (
+            'Проверьте, что изменённые жанры и категории сразу видны в ответах'
+        )
+
+        category.delete()
+        assert client.get(url).json()['category'] is None
+        assert client.get('/api/v1/titles/', {'category': 'films'}).json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_changes_of_other_processes(self, client, admin_client, settings):
+        from reviews.models import Category, Genre
+
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+
+        # update() sends no signals, like a write of a process with its own cache
+        Genre.objects.filter(slug='horror').update(name='Хоррор')
+        Category.objects.filter(slug='films').update(slug='movies')
+        assert client.get(url).json()['category']['slug'] == 'films'
+
+        settings.DICTIONARY_TTL = 0
+        data = client.get(url).json()
+        assert data['genre'][0]['name'] == 'Хоррор' and data['category']['slug'] == 'movies', (
+            'Проверьте, что изменения жанров и категорий другими процессами видны по истечении DICTIONARY_TTL'
+        )
+        assert client.get('/api/v1/titles/', {'category': 'movies'}).json()['count'] == 1
+        assert client.get('/api/v1/titles/', {'category': 'films'}).json()['count'] == 0